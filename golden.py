@@ -0,0 +1,308 @@
+# golden.py - Golden reference dataset and differential harness for the NightSky Helper engines
+# Generates reference sunset / dark sky / sunrise times and 10 PM altitudes for several sites and years,
+# then checks any engine (basic, oop, render, fast) against them within stated tolerances.
+#
+# Usage:
+#   python golden.py generate [--start 2020-01-01] [--end 2030-12-31] [--step-days 5]
+#   python golden.py compare --engine render [--time-tolerance 2] [--altitude-margin 0.25]
+#
+# Reference definitions (independent of any one engine's event bookkeeping):
+#   sunset     - first time the Sun's centre sets below -0.8333 degrees between local noon on the
+#                date and local noon the next day
+#   dark_sky   - first time the Sun sets below -18 degrees in the same noon-to-noon window
+#   sunrise    - first time the Sun rises above -0.8333 degrees in that window after sunset
+#                (or anywhere in the window when there is no sunset)
+#   altitudes  - apparent altitude (no refraction) of each planet and star at 10 PM local time
+# Times are stored in UTC so DST changes (e.g. 2025-11-02 in Denver) cannot shift them.
+# Generation needs Skyfield's de421.bsp; comparing only needs the engine under test.
+
+import argparse
+import csv
+import importlib.util
+import os
+import sys
+from datetime import date, datetime, timedelta
+import pytz
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+GOLDEN_FILE = os.path.join(ROOT, "golden_reference.csv")
+
+# Denver plus an equatorial, a southern-hemisphere and two high-latitude sites (midnight sun,
+# polar night and nights with no astronomical darkness)
+SITES = {
+    "Denver": (39.7392, -104.9903, "America/Denver"),
+    "Quito": (-0.1807, -78.4678, "America/Guayaquil"),
+    "Sydney": (-33.8688, 151.2093, "Australia/Sydney"),
+    "Tromso": (69.6492, 18.9553, "Europe/Oslo"),
+    "Fairbanks": (64.8378, -147.7164, "America/Anchorage"),
+}
+
+EVENTS = ("sunset", "dark_sky", "sunrise")
+PLANETS = ['Mercury', 'Venus', 'Mars', 'Jupiter', 'Saturn', 'Uranus', 'Neptune']
+STARS = ['Sirius', 'Arcturus', 'Vega', 'Capella', 'Rigel', 'Procyon', 'Betelgeuse']
+
+# Dates called out in nightsky-basic.py as looking wrong around the 2025 DST change
+NOTED_DATES = [date(2025, 10, 5), date(2025, 10, 25), date(2025, 11, 1), date(2025, 11, 2), date(2025, 11, 10)]
+
+SUN_HORIZON = -0.8333
+DARK_HORIZON = -18.0
+
+def _local(tz, d: date, hour: int) -> datetime:
+    return tz.localize(datetime(d.year, d.month, d.day, hour))
+
+def _dst_edges(tz, start: date, end: date) -> set:
+    # The day before, of and after every UTC offset change in the range
+    edges = set()
+    d = start
+    previous = _local(tz, d, 12).utcoffset()
+    while d < end:
+        d += timedelta(days=1)
+        offset = _local(tz, d, 12).utcoffset()
+        if offset != previous:
+            edges.update({d - timedelta(days=1), d, d + timedelta(days=1)})
+        previous = offset
+    return edges
+
+def _reference_site(eph, ts, name: str, start: date, end: date, step_days: int) -> list[dict]:
+    from skyfield import almanac
+    from skyfield.api import Topos
+    sys.path.insert(0, os.path.join(ROOT, "nightsky-render"))
+    from celestial_objects import PLANET_MAP, STAR_COORDS
+
+    lat, lon, tz_name = SITES[name]
+    tz = pytz.timezone(tz_name)
+    observer = eph['earth'] + Topos(latitude_degrees=lat, longitude_degrees=lon)
+
+    # One search over the whole span per event kind, then binned into noon-to-noon nights
+    t0 = ts.from_datetime(_local(tz, start, 12))
+    t1 = ts.from_datetime(_local(tz, end + timedelta(days=1), 12))
+    crossings = {}
+    for event, finder, horizon in (("sunset", almanac.find_settings, SUN_HORIZON),
+                                   ("dark_sky", almanac.find_settings, DARK_HORIZON),
+                                   ("sunrise", almanac.find_risings, SUN_HORIZON)):
+        times, real = finder(observer, eph['sun'], t0, t1, horizon_degrees=horizon)
+        crossings[event] = [t.utc_datetime() for t, ok in zip(times, real) if ok]
+
+    def first(event, after, before):
+        return next((t for t in crossings[event] if after <= t < before), None)
+
+    samples = {start + timedelta(days=i) for i in range(0, (end - start).days + 1, step_days)}
+    samples |= _dst_edges(tz, start, end) | {d for d in NOTED_DATES if start <= d <= end}
+
+    rows, previous_pattern = [], None
+    d = start
+    while d <= end:
+        noon = _local(tz, d, 12).astimezone(pytz.utc)
+        next_noon = _local(tz, d + timedelta(days=1), 12).astimezone(pytz.utc)
+        sunset = first("sunset", noon, next_noon)
+        events = {
+            "sunset": sunset,
+            "dark_sky": first("dark_sky", noon, next_noon),
+            "sunrise": first("sunrise", sunset or noon, next_noon),
+        }
+        # Keep sampled nights plus every night where an event appears or disappears (polar edges)
+        pattern = tuple(events[e] is None for e in EVENTS)
+        if d in samples or pattern != previous_pattern:
+            rows.append({"site": name, "date": d, **events})
+        previous_pattern = pattern
+        d += timedelta(days=1)
+
+    # 10 PM altitudes for the kept nights: one vectorized observation per object
+    t_night = ts.from_datetimes([_local(tz, row["date"], 22) for row in rows])
+    targets = {**{p: eph[PLANET_MAP[p]] for p in PLANETS}, **{s: STAR_COORDS[s] for s in STARS}}
+    for object_name, target in targets.items():
+        altitudes = observer.at(t_night).observe(target).apparent().altaz()[0].degrees
+        for row, alt in zip(rows, altitudes):
+            row[object_name] = alt
+    return rows
+
+def generate(args):
+    from skyfield.api import load
+    try:
+        eph, ts = load('de421.bsp'), load.timescale()
+    except Exception as e:
+        raise SystemExit(f"Cannot load de421.bsp ({e}); no reference written.")
+    start = datetime.strptime(args.start, "%Y-%m-%d").date()
+    end = datetime.strptime(args.end, "%Y-%m-%d").date()
+
+    with open(args.golden, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(["site", "date", *EVENTS, *PLANETS, *STARS])
+        count = 0
+        for name in SITES:
+            for row in _reference_site(eph, ts, name, start, end, args.step_days):
+                writer.writerow([
+                    row["site"], row["date"].isoformat(),
+                    *[row[e].strftime("%Y-%m-%dT%H:%M:%SZ") if row[e] else "" for e in EVENTS],
+                    *[f"{row[o]:.3f}" for o in PLANETS + STARS],
+                ])
+                count += 1
+    print(f"{count} reference night(s) written to '{args.golden}'.")
+
+def load_golden(filename: str) -> dict:
+    # {site: [row, ...]} with dates parsed, event times as aware UTC datetimes (or None), altitudes as floats
+    by_site = {}
+    with open(filename, 'r', newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            parsed = {"date": datetime.strptime(row["date"], "%Y-%m-%d").date()}
+            for event in EVENTS:
+                parsed[event] = (datetime.strptime(row[event], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=pytz.utc)
+                                 if row[event] else None)
+            for object_name in PLANETS + STARS:
+                parsed[object_name] = float(row[object_name])
+            by_site.setdefault(row["site"], []).append(parsed)
+    return by_site
+
+# Engine adapters: each takes (site name, list of dates) and returns one dict per date with the
+# formatted sunset / dark_sky / sunrise strings and the visible planet and star lists, or the
+# exception the engine raised for that night (reported as a discrepancy, not a crash).
+# Only one engine is imported per run: the folders reuse module names (sky_calculator, location, ...).
+
+def _per_night(calculate, dates) -> list:
+    results = []
+    for d in dates:
+        try:
+            results.append(calculate(d))
+        except Exception as e:
+            results.append(e)
+    return results
+
+def _engine_basic():
+    spec = importlib.util.spec_from_file_location("nightsky_basic", os.path.join(ROOT, "nightsky-basic.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    def run(site, dates):
+        return _per_night(module.calculate_sky_data, dates)
+    return run, {"Denver"}
+
+def _engine_oop():
+    sys.path.insert(0, os.path.join(ROOT, "nightsky-oop"))
+    import sky_calculator
+    # Moon illumination is not part of the reference; skip the download
+    sky_calculator.get_moon_illumination = lambda obs_date: "N/A"
+    calculator = sky_calculator.SkyCalculator()
+
+    def run(site, dates):
+        return _per_night(lambda d: vars(calculator.calculate(d)), dates)
+    return run, {"Denver"}
+
+def _engine_render(precision: str):
+    sys.path.insert(0, os.path.join(ROOT, "nightsky-render"))
+    from sky_calculator import SkyCalculator
+    from location import Location
+
+    def run(site, dates):
+        lat, lon, tz_name = SITES[site]
+        calculator = SkyCalculator(Location(lat, lon, tz_name, name=site), precision=precision)
+        # Moon and weather are not part of the reference; skip the downloads
+        def calculate(batch):
+            return [vars(o) for o in calculator.calculate_many(batch, moon_illums={}, cloud_covers={})]
+        try:
+            return calculate(dates)
+        except Exception:
+            # Retry night by night so only the nights that fail are reported
+            return _per_night(lambda d: calculate([d])[0], dates)
+    return run, set(SITES)
+
+ENGINES = {
+    "basic": _engine_basic,
+    "oop": _engine_oop,
+    "render": lambda: _engine_render("full"),
+    "fast": lambda: _engine_render("fast"),
+}
+
+def _minutes_off(engine_value: str, reference, tz):
+    # Signed minutes from the reference to the engine's "7:05 PM" string, compared as local clock time
+    local = reference.astimezone(tz)
+    engine_time = datetime.strptime(engine_value, "%I:%M %p")
+    diff = (engine_time.hour * 60 + engine_time.minute) - (local.hour * 60 + local.minute + local.second / 60.0)
+    return (diff + 720) % 1440 - 720
+
+def compare_site(site: str, rows: list, results: list, time_tolerance: float, altitude_margin: float) -> list[str]:
+    # Discrepancy messages for one site; objects within altitude_margin of the horizon are not judged
+    tz = pytz.timezone(SITES[site][2])
+    problems = []
+    for row, result in zip(rows, results):
+        label = f"{site} {row['date'].isoformat()}"
+        if isinstance(result, Exception):
+            problems.append(f"{label}: engine raised {type(result).__name__}: {result}")
+            continue
+        for event in EVENTS:
+            value, reference = result[event], row[event]
+            if reference is None or value == "Unavailable":
+                if (reference is None) != (value == "Unavailable"):
+                    expected = "none" if reference is None else reference.astimezone(tz).strftime("%I:%M %p").lstrip("0")
+                    problems.append(f"{label} {event}: engine {value}, reference {expected}")
+                continue
+            off = _minutes_off(value, reference, tz)
+            if abs(off) > time_tolerance:
+                problems.append(f"{label} {event}: engine {value}, reference "
+                                f"{reference.astimezone(tz).strftime('%I:%M:%S %p').lstrip('0')} ({off:+.1f} min)")
+        for kind, names in (("planets", PLANETS), ("stars", STARS)):
+            for object_name in names:
+                alt = row[object_name]
+                if abs(alt) <= altitude_margin:
+                    continue
+                if (object_name in result[kind]) != (alt > 0):
+                    state = "listed" if object_name in result[kind] else "missing"
+                    problems.append(f"{label} {object_name}: {state}, reference altitude {alt:.2f}")
+    return problems
+
+def compare(args):
+    if not os.path.exists(args.golden):
+        print(f"No golden dataset at '{args.golden}'. Run 'python golden.py generate' first (needs de421.bsp).")
+        return 2
+
+    golden = load_golden(args.golden)
+    run, supported = ENGINES[args.engine]()
+    sites = [s for s in (args.site or golden) if s in golden and s in supported]
+    if not sites:
+        print(f"Engine '{args.engine}' supports none of the requested sites.")
+        return 2
+
+    total_problems = 0
+    for site in sites:
+        rows = golden[site]
+        problems = compare_site(site, rows, run(site, [row["date"] for row in rows]),
+                                args.time_tolerance, args.altitude_margin)
+        total_problems += len(problems)
+        print(f"{site}: {len(rows)} night(s), {len(problems)} discrepanc{'y' if len(problems) == 1 else 'ies'}")
+        for message in problems[:args.show]:
+            print(f"  {message}")
+        if len(problems) > args.show:
+            print(f"  ... {len(problems) - args.show} more")
+
+    skipped = sorted(set(golden) - set(sites))
+    if skipped:
+        print(f"Not checked (unsupported by '{args.engine}' or not requested): {', '.join(skipped)}")
+    # Non-zero exit so a run in CI fails when an engine change moves any answer out of tolerance
+    return 1 if total_problems else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="NightSky Helper golden reference dataset and differential harness")
+    parser.add_argument("--golden", default=GOLDEN_FILE, help="reference CSV (default: golden_reference.csv)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    gen = commands.add_parser("generate", help="compute the reference dataset with Skyfield and de421")
+    gen.add_argument("--start", default="2020-01-01")
+    gen.add_argument("--end", default="2030-12-31")
+    gen.add_argument("--step-days", type=int, default=5)
+
+    cmp = commands.add_parser("compare", help="run an engine against the reference dataset")
+    cmp.add_argument("--engine", choices=sorted(ENGINES), required=True)
+    cmp.add_argument("--site", action="append", help="limit to a site (repeatable)")
+    cmp.add_argument("--time-tolerance", type=float, default=2.0,
+                     help="allowed event time difference in minutes (engines print whole minutes)")
+    cmp.add_argument("--altitude-margin", type=float, default=0.25,
+                     help="objects this close to the horizon (degrees) are not judged")
+    cmp.add_argument("--show", type=int, default=20, help="discrepancies listed per site")
+
+    args = parser.parse_args()
+    if args.command == "generate":
+        generate(args)
+        return 0
+    return compare(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,12 +7,17 @@ Location coordinates and timezone may be updated for other areas.
 """
 
 # Import modules to support program execution
+# (Skyfield is imported inside calculate_sky_data, so runs answered by the daemon never load it)
 import csv
+import os
+import sys
 from datetime import datetime, timedelta
-from skyfield.api import load, Star, Topos
-from skyfield.almanac import find_discrete, dark_twilight_day
 import pytz
 
+# The calculation daemon's client lives with the OOP version
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "nightsky-oop"))
+from daemon_client import calculate_via_daemon
+
 # Constants for location (Denver coordinates)
 LATITUDE = 39.7392
 LONGITUDE = -104.9903
@@ -35,15 +40,15 @@ PLANET_MAP = {
     'Neptune': 'neptune barycenter'
 }
 
-# Mapping common Star names to Skyfield's Star() object celestial coordinates (RA/Dec)
+# Common Star names with their celestial coordinates (RA hours, Dec degrees) for Skyfield's Star()
 STAR_COORDS = {
-    'Sirius': Star(ra_hours=6 + 45/60 + 8.9/3600, dec_degrees=-16 - 42/60 - 58/3600),
-    'Arcturus': Star(ra_hours=14 + 15/60 + 39.7/3600, dec_degrees=19 + 10/60 + 56/3600),
-    'Vega': Star(ra_hours=18 + 36/60 + 56.3/3600, dec_degrees=38 + 47/60 + 1/3600),
-    'Capella': Star(ra_hours=5 + 16/60 + 41.4/3600, dec_degrees=45 + 59/60 + 52/3600),
-    'Rigel': Star(ra_hours=5 + 14/60 + 32.3/3600, dec_degrees=-8 - 12/60 - 6/3600),
-    'Procyon': Star(ra_hours=7 + 39/60 + 18.1/3600, dec_degrees=5 + 13/60 + 30/3600),
-    'Betelgeuse': Star(ra_hours=5 + 55/60 + 10.3/3600, dec_degrees=7 + 24/60 + 25/3600)
+    'Sirius': (6 + 45/60 + 8.9/3600, -16 - 42/60 - 58/3600),
+    'Arcturus': (14 + 15/60 + 39.7/3600, 19 + 10/60 + 56/3600),
+    'Vega': (18 + 36/60 + 56.3/3600, 38 + 47/60 + 1/3600),
+    'Capella': (5 + 16/60 + 41.4/3600, 45 + 59/60 + 52/3600),
+    'Rigel': (5 + 14/60 + 32.3/3600, -8 - 12/60 - 6/3600),
+    'Procyon': (7 + 39/60 + 18.1/3600, 5 + 13/60 + 30/3600),
+    'Betelgeuse': (5 + 55/60 + 10.3/3600, 7 + 24/60 + 25/3600)
 }
 
 # Global list to store multiple stargazing results
@@ -73,8 +78,18 @@ def get_user_date():
             print("\nProgram interrupted. Exiting.")
             exit()
 
+def get_sky_data(obs_date):
+    # Ask the calculation daemon (nightsky-oop/daemon.py) if it is running, otherwise compute here
+    observation = calculate_via_daemon(obs_date, include_moon=False)
+    if observation is not None:
+        # Same fields this program stores (the daemon also reports moon illumination)
+        return {key: observation[key] for key in ('date', 'sunset', 'dark_sky', 'sunrise', 'planets', 'stars')}
+    return calculate_sky_data(obs_date)
+
 def calculate_sky_data(obs_date):
     # Use Skyfield library to calculate visible planets and stars
+    from skyfield.api import load, Star, Topos
+    from skyfield.almanac import find_discrete, dark_twilight_day
 
     # Load ephemeris data from Skyfield (de421.bsp includes planets and the moon)
     eph = load('de421.bsp')
@@ -116,8 +131,8 @@ def calculate_sky_data(obs_date):
     # Determine which stars are visible above the horizon at 10 PM
     visible_stars = [
         name for name in CELESTIAL_OBJECTS['stars']
-        if (star := STAR_COORDS.get(name)) and
-        location.at(t_night).observe(star).apparent().altaz()[0].degrees > 0
+        if (coords := STAR_COORDS.get(name)) and
+        location.at(t_night).observe(Star(ra_hours=coords[0], dec_degrees=coords[1])).apparent().altaz()[0].degrees > 0
     ]
 
     """
@@ -218,7 +233,7 @@ def main_menu():
 
         if choice == '1':
             obs_date = get_user_date()
-            observation = calculate_sky_data(obs_date)
+            observation = get_sky_data(obs_date)
             results.append(observation)
             display_results(observation)
 
@@ -241,7 +256,7 @@ if __name__ == "__main__":
     if results:
         print(f"Loaded {len(results)} past observation(s) from 'nightsky_results.csv'.")
     obs_date = get_user_date()
-    observation = calculate_sky_data(obs_date)
+    observation = get_sky_data(obs_date)
     results.append(observation)
     display_results(observation)
 
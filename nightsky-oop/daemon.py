@@ -0,0 +1,120 @@
+# daemon.py - Optional calculation daemon for NightSky Helper
+# Keeps one warm SkyCalculator (ephemeris loaded once) and a result cache, and answers the console
+# clients over a Unix socket so they skip the Skyfield imports and ephemeris load on every run
+
+"""
+Start it once in its own terminal:  python daemon.py
+main.py and nightsky-basic.py use it automatically while it runs and compute in-process otherwise.
+
+Protocol: one JSON object per line in each direction.
+  {"op": "ping"}                                           -> {"ok": true}
+  {"op": "calculate", "date": "YYYY-MM-DD", "moon": true}  -> {"ok": true, "observation": {...}}
+  {"op": "stats"}                                          -> {"ok": true, "cached": N, "hits": N, "misses": N}
+Errors come back as {"ok": false, "error": "..."}.
+"""
+
+# Import modules to support program execution
+import json
+import os
+import socket
+import socketserver
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from datetime import datetime
+from sky_calculator import SkyCalculator
+from daemon_client import SOCKET_PATH, request_daemon, socket_owned_by_user
+
+# Most recent results kept in memory, keyed by (date, include_moon)
+CACHE_SIZE = 1024
+
+class CalculationService:
+    # Warm calculator plus an LRU cache of finished observations
+    def __init__(self):
+        self.calculator = SkyCalculator()
+        self.cache: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()  # Skyfield objects are shared, so calculations run one at a time
+        self.hits = 0
+        self.misses = 0
+
+    def calculate(self, obs_date, include_moon: bool) -> dict:
+        key = (obs_date, include_moon)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+            self.misses += 1
+            observation = asdict(self.calculator.calculate(obs_date, include_moon=include_moon))
+            # "N/A" usually means the moon download failed; don't pin that until the daemon restarts
+            if include_moon and observation["moon_illum"] == "N/A":
+                return observation
+            self.cache[key] = observation
+            if len(self.cache) > CACHE_SIZE:
+                self.cache.popitem(last=False)
+            return observation
+
+    def handle(self, request: dict) -> dict:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True}
+        if op == "stats":
+            return {"ok": True, "cached": len(self.cache), "hits": self.hits, "misses": self.misses}
+        if op == "calculate":
+            try:
+                obs_date = datetime.strptime(request.get("date", ""), "%Y-%m-%d").date()
+            except ValueError:
+                return {"ok": False, "error": "Invalid date format. Use YYYY-MM-DD."}
+            return {"ok": True, "observation": self.calculate(obs_date, bool(request.get("moon", True)))}
+        return {"ok": False, "error": f"Unknown op '{op}'."}
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    # Serves any number of request lines on one connection
+    def handle(self):
+        for line in self.rfile:
+            try:
+                reply = self.server.service.handle(json.loads(line))
+            except ValueError:
+                reply = {"ok": False, "error": "Requests must be one JSON object per line."}
+            except Exception as e:
+                reply = {"ok": False, "error": f"Failed to calculate observation: {e}"}
+            self.wfile.write((json.dumps(reply) + "\n").encode("utf-8"))
+
+class DaemonServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: str, service: CalculationService):
+        self.service = service
+        super().__init__(path, RequestHandler)
+
+def main():
+    if not hasattr(socket, "AF_UNIX"):
+        print("Unix sockets are not available on this system; the console programs will compute in-process.")
+        return
+    if request_daemon({"op": "ping"}, timeout=2.0):
+        print(f"A NightSky Helper daemon is already running on '{SOCKET_PATH}'.")
+        return
+    if os.path.lexists(SOCKET_PATH):
+        if not socket_owned_by_user():
+            print(f"'{SOCKET_PATH}' belongs to another user; set NIGHTSKY_SOCKET to a path of your own.")
+            return
+        os.unlink(SOCKET_PATH)  # left behind by a daemon that did not shut down cleanly
+
+    print("Loading ephemeris...")
+    service = CalculationService()
+    old_umask = os.umask(0o177)  # socket readable and writable by this user only
+    try:
+        server = DaemonServer(SOCKET_PATH, service)
+    finally:
+        os.umask(old_umask)
+    with server:
+        print(f"NightSky Helper daemon listening on '{SOCKET_PATH}' (Ctrl+C to stop).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopping daemon.")
+        finally:
+            os.unlink(SOCKET_PATH)
+
+if __name__ == "__main__":
+    main()
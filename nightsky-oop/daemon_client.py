@@ -0,0 +1,49 @@
+# daemon_client.py - Thin client for the NightSky Helper calculation daemon
+# Asks a running daemon.py for results over its Unix socket; returns None when no daemon is available
+
+# Import modules to support program execution (standard library only, so the client starts fast)
+import json
+import os
+import socket
+import tempfile
+
+def _default_socket_path() -> str:
+    # Per user, so no one else can put a socket where the clients look: $XDG_RUNTIME_DIR is private
+    # to the user; otherwise the user id goes into the name in the shared temp directory
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "nightsky-helper.sock")
+    user = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"nightsky-helper-{user}.sock")
+
+# Socket shared by daemon.py and its clients; NIGHTSKY_SOCKET overrides the default location
+SOCKET_PATH = os.environ.get("NIGHTSKY_SOCKET") or _default_socket_path()
+
+def socket_owned_by_user(path: str = SOCKET_PATH) -> bool:
+    # Only trust a socket created by this user (a daemon started by anyone else could send forged results)
+    try:
+        return not hasattr(os, "getuid") or os.lstat(path).st_uid == os.getuid()
+    except OSError:
+        return False
+
+def request_daemon(payload: dict, timeout: float = 60.0):
+    # Send one JSON request line and read one JSON reply line; None if this user's daemon is not running
+    if not hasattr(socket, "AF_UNIX") or not socket_owned_by_user():
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(SOCKET_PATH)
+            sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as reply:
+                line = reply.readline()
+    except OSError:
+        return None
+    return json.loads(line) if line else None
+
+def calculate_via_daemon(obs_date, include_moon: bool = True):
+    # Observation fields as a dict from the daemon, or None so the caller computes it in-process
+    reply = request_daemon({"op": "calculate", "date": obs_date.isoformat(), "moon": include_moon})
+    if not reply or not reply.get("ok"):
+        return None
+    return reply["observation"]
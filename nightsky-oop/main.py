@@ -3,9 +3,24 @@
 
 # Import modules to support program execution
 from models import Observation
-from sky_calculator import SkyCalculator
 from data_storage import load_observations, save_observations
 from utils import get_user_date, display_results
+from daemon_client import calculate_via_daemon
+
+# One in-process calculator, created on first use and reused for every date after that
+calculator = None
+
+def calculate_observation(obs_date) -> Observation:
+    # Ask the calculation daemon (daemon.py) if it is running, otherwise compute here
+    global calculator
+    observation = calculate_via_daemon(obs_date)
+    if observation is not None:
+        return Observation(**observation)
+
+    if calculator is None:
+        from sky_calculator import SkyCalculator  # Skyfield is only imported when it is needed
+        calculator = SkyCalculator()
+    return calculator.calculate(obs_date)
 
 def main_menu():
     # Main function runs user menu and program execution
@@ -18,8 +33,7 @@ def main_menu():
 
         if choice == '1':
             obs_date = get_user_date()
-            calculator = SkyCalculator()
-            observation = calculator.calculate(obs_date)
+            observation = calculate_observation(obs_date)
             results.append(observation)
             display_results(observation)
 
@@ -50,8 +64,7 @@ if __name__ == "__main__":
 
     # Run one observation
     obs_date = get_user_date()
-    calculator = SkyCalculator()
-    observation = calculator.calculate(obs_date)
+    observation = calculate_observation(obs_date)
     results.append(observation)
     display_results(observation)
 
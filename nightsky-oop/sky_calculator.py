@@ -18,7 +18,7 @@ class SkyCalculator:
         self.ts = load.timescale()
         self.observer = DENVER
 
-    def calculate(self, obs_date: datetime.date) -> Observation:
+    def calculate(self, obs_date: datetime.date, include_moon: bool = True) -> Observation:
         # Use Skyfield library to calculate visible planets and stars
 
         observer_loc = self.eph['earth'] + self.observer.topos
@@ -60,7 +60,7 @@ class SkyCalculator:
         ]
 
         # New feature: added moon illumination data via web scraping
-        moon_illum = get_moon_illumination(obs_date)
+        moon_illum = get_moon_illumination(obs_date) if include_moon else "N/A"
 
         # Return all relevant stargazing data
         return Observation(
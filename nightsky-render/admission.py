@@ -0,0 +1,109 @@
+# admission.py - Admission control and backpressure for NightSky Helper
+# Caps how much expensive work each endpoint runs at once, queues a bounded number of requests
+# behind it with a deadline, and sheds the rest immediately so callers can retry later
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+@dataclass
+class EndpointLimit:
+    capacity: int = 4         # cost units that may run at the same time
+    max_queue: int = 16       # requests allowed to wait for capacity
+    timeout: float = 10.0     # seconds a queued request waits before giving up
+
+class Overloaded(Exception):
+    # Raised instead of admitting a request; status is 429 (queue full) or 503 (deadline passed)
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+class _Endpoint:
+    def __init__(self, limit: EndpointLimit):
+        self.limit = limit
+        self.in_use = 0
+        self.queue = deque()
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_deadline = 0
+        self.avg_seconds = 1.0  # moving average of service time, for Retry-After estimates
+
+class AdmissionController:
+    """
+    Per-endpoint weighted concurrency limiter with a bounded FIFO wait queue.
+
+    Each request carries a cost (e.g. number of nights computed). A request runs once the
+    endpoint's in-use cost plus its own fits in capacity; costs above capacity are clamped so a
+    very large request still runs, just alone. Waiters are served in arrival order so large
+    requests are not starved by a stream of small ones.
+    """
+
+    def __init__(self, limits: dict[str, EndpointLimit]):
+        self._cond = threading.Condition()
+        self._endpoints = {name: _Endpoint(limit) for name, limit in limits.items()}
+
+    @contextmanager
+    def admit(self, endpoint: str, cost: int = 1):
+        state = self._endpoints[endpoint]
+        cost = max(1, min(int(cost), state.limit.capacity))
+        ticket = object()
+
+        with self._cond:
+            if not self._fits(state, cost) or state.queue:
+                if len(state.queue) >= state.limit.max_queue:
+                    state.shed_queue_full += 1
+                    raise Overloaded("Server is busy, please retry shortly.", 429, self._retry_after(state))
+
+                state.queue.append(ticket)
+                deadline = time.monotonic() + state.limit.timeout
+                try:
+                    while state.queue[0] is not ticket or not self._fits(state, cost):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            state.shed_deadline += 1
+                            raise Overloaded("Timed out waiting for capacity, please retry.", 503,
+                                             self._retry_after(state))
+                        self._cond.wait(remaining)
+                finally:
+                    state.queue.remove(ticket)
+                    self._cond.notify_all()
+
+            state.in_use += cost
+            state.admitted += 1
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                state.in_use -= cost
+                state.avg_seconds = 0.8 * state.avg_seconds + 0.2 * (time.monotonic() - started)
+                self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                name: {
+                    "capacity": state.limit.capacity,
+                    "in_use": state.in_use,
+                    "queue_depth": len(state.queue),
+                    "max_queue": state.limit.max_queue,
+                    "admitted": state.admitted,
+                    "shed_queue_full": state.shed_queue_full,
+                    "shed_deadline": state.shed_deadline,
+                }
+                for name, state in self._endpoints.items()
+            }
+
+    @staticmethod
+    def _fits(state: _Endpoint, cost: int) -> bool:
+        return state.in_use + cost <= state.limit.capacity
+
+    @staticmethod
+    def _retry_after(state: _Endpoint) -> int:
+        # Rough time for the current queue to drain, in whole seconds
+        return max(1, math.ceil(state.avg_seconds * (len(state.queue) + 1)))
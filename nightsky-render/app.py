@@ -1,19 +1,210 @@
 # app.py - Flask API for NightSky Helper
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+from functools import wraps
 from flask_cors import CORS
-from sky_calculator import SkyCalculator
-from datetime import datetime
+from sky_calculator import SkyCalculator, PRECISIONS
+from moon import get_moon_illuminations
+from weather import get_cloud_covers, default_service as weather_service
+from location import Location, SITES
+from dso_catalog import load_catalog
+from satellites import predict_passes
+from coalesce import SingleFlight
+from admission import AdmissionController, EndpointLimit, Overloaded
+from render_cache import RenderCache
+from sky_chart import chart_objects, render_svg, render_png
+from sky_grid import compute_grid, grid_geojson, grid_binary, rounded_list
+from sky_brightness import default_raster
+from profiler import ProfileStore, ProfilingMiddleware, PROFILE_HEADER, token_matches
+from celestial_objects import PLANET_MAP
+import numpy as np
+from datetime import datetime, timedelta
+import json
+import os
+import tempfile
+import pytz
 
 app = Flask(__name__)
 CORS(app)  # allow cross-origin requests from the frontend
 
+# Upper bound on ?limit= for the target ranking endpoint
+MAX_TARGETS = 100
+
+# Identical concurrent observation requests share one calculation. Set NIGHTSKY_COALESCE_DIR
+# to a local directory to also coalesce across gunicorn workers via lock files (swept after 5 minutes).
+observation_flight = SingleFlight(os.environ.get("NIGHTSKY_COALESCE_DIR"))
+
+# Longest ?start=..&end=.. range served in one request; streamed ranges may be longer
+# because they are computed and sent STREAM_CHUNK_NIGHTS at a time
+MAX_RANGE_NIGHTS = 366
+MAX_STREAM_NIGHTS = 3660
+STREAM_CHUNK_NIGHTS = 7
+
+# Admission limits per endpoint, in cost units (nights for observations). Override any of them with
+# NIGHTSKY_ADMISSION_LIMITS='{"observations": {"capacity": 8, "max_queue": 32, "timeout": 5}}'
+ADMISSION_LIMITS = {
+    "observations": EndpointLimit(capacity=16, max_queue=32, timeout=15.0),
+    "targets": EndpointLimit(capacity=4, max_queue=16, timeout=10.0),
+    "satellites": EndpointLimit(capacity=2, max_queue=8, timeout=10.0),
+    "charts": EndpointLimit(capacity=4, max_queue=16, timeout=10.0),
+    "grid": EndpointLimit(capacity=2, max_queue=8, timeout=15.0),
+}
+for _name, _overrides in json.loads(os.environ.get("NIGHTSKY_ADMISSION_LIMITS", "{}")).items():
+    ADMISSION_LIMITS[_name] = EndpointLimit(**{**vars(ADMISSION_LIMITS.get(_name, EndpointLimit())), **_overrides})
+
+admission = AdmissionController(ADMISSION_LIMITS)
+
+# Sky charts are cached by (site, time rounded to CHART_TIME_STEP minutes, size, format)
+CHART_TIME_STEP = 5
+CHART_SIZES = (200, 2000)
+chart_cache = RenderCache()
+
+# Largest grid edge accepted by /api/grid (cells per axis)
+MAX_GRID_SIZE = 200
+
+# Opt-in request profiling. Requests carrying the X-Nightsky-Profile header equal to
+# NIGHTSKY_PROFILE_TOKEN are always profiled; NIGHTSKY_PROFILE_SAMPLE_RATE (0-1) profiles a random
+# share of the rest. With neither set the middleware is not installed, so profiling costs nothing.
+# The newest NIGHTSKY_PROFILE_KEEP profiles are kept in NIGHTSKY_PROFILE_DIR.
+PROFILE_TOKEN = os.environ.get("NIGHTSKY_PROFILE_TOKEN") or None
+PROFILE_SAMPLE_RATE = float(os.environ.get("NIGHTSKY_PROFILE_SAMPLE_RATE", "0"))
+profile_store = None
+if PROFILE_TOKEN or PROFILE_SAMPLE_RATE > 0:
+    profile_store = ProfileStore(
+        os.environ.get("NIGHTSKY_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "nightsky-profiles")),
+        max_profiles=int(os.environ.get("NIGHTSKY_PROFILE_KEEP", "50")),
+    )
+    app.wsgi_app = ProfilingMiddleware(app.wsgi_app, profile_store, token=PROFILE_TOKEN,
+                                       sample_rate=PROFILE_SAMPLE_RATE, skip_prefixes=("/api/admin/",))
+
+def admitted(endpoint: str, cost=None):
+    """
+    Decorator: runs the view only once the admission controller lets it in.
+    cost(args) gives the request's weight; overloaded requests get a fast 429/503 with Retry-After.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            weight = cost(request.args) if cost else 1
+            slot = admission.admit(endpoint, weight)
+            try:
+                slot.__enter__()
+            except Overloaded as e:
+                response = jsonify({"error": str(e)})
+                response.status_code = e.status
+                response.headers["Retry-After"] = str(e.retry_after)
+                return response
+
+            try:
+                response = app.make_response(view(*args, **kwargs))
+            except BaseException:
+                slot.__exit__(None, None, None)
+                raise
+
+            # Streamed bodies are produced after the view returns and admit each chunk themselves
+            # (see admitted_chunks), so the slot only covers the view itself
+            slot.__exit__(None, None, None)
+            return response
+        return wrapper
+    return decorator
+
+def requested_nights(args) -> int:
+    # Admission cost of an observation request: one unit per night computed. Streams only validate
+    # their arguments in the view; their nights are charged chunk by chunk while the body is sent
+    if args.get("stream"):
+        return 1
+    try:
+        start = datetime.strptime(args["start"], "%Y-%m-%d").date()
+        end = datetime.strptime(args["end"], "%Y-%m-%d").date()
+        return max(1, min((end - start).days + 1, MAX_STREAM_NIGHTS))
+    except (KeyError, ValueError):
+        return 1
+
+def site_from_args(args) -> Location:
+    """
+    Resolves the observing site from query parameters:
+    ?site=<name> for a named site, or ?lat=..&lon=..&tz=.. for any location.
+    Defaults to Denver. Raises ValueError for unknown or invalid sites.
+    """
+    if "lat" in args or "lon" in args:
+        try:
+            latitude = float(args["lat"])
+            longitude = float(args["lon"])
+            tz_name = args.get("tz", "UTC")
+            pytz.timezone(tz_name)
+        except (KeyError, ValueError, pytz.UnknownTimeZoneError):
+            raise ValueError("Custom sites need numeric 'lat' and 'lon' and a valid 'tz'.")
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValueError("'lat' must be within [-90, 90] and 'lon' within [-180, 180].")
+        return Location(latitude, longitude, tz_name)
+
+    site_name = args.get("site", "denver").lower()
+    if site_name not in SITES:
+        raise ValueError(f"Unknown site '{site_name}'. Choose from: {', '.join(SITES)}.")
+    return SITES[site_name]
+
+def precision_from_args(args) -> str:
+    # ?precision=full (de421, default) or ?precision=fast (analytic, no ephemeris file)
+    precision = args.get("precision", "full").lower()
+    if precision not in PRECISIONS:
+        raise ValueError(f"'precision' must be one of: {', '.join(PRECISIONS)}.")
+    return precision
+
+def site_key(site: Location) -> tuple:
+    # Hashable identity of a site for cache and coalescing keys
+    return (round(site.latitude, 4), round(site.longitude, 4), site.tz.zone)
+
+def compute_observation(site: Location, obs_date, precision: str = "full") -> dict:
+    # Full calculation for one night, as a JSON-ready dict
+    return observation_to_dict(SkyCalculator(site, precision).calculate(obs_date))
+
+def compute_observations(site: Location, start, end, precision: str = "full") -> list[dict]:
+    # Every night from start to end inclusive
+    return [obs for chunk in observation_chunks(site, start, end, precision) for obs in chunk]
+
+def observation_chunks(site: Location, start, end, precision: str = "full"):
+    """
+    Yields lists of observation dicts, STREAM_CHUNK_NIGHTS nights at a time, in date order.
+    One calculator (one ephemeris load), one moon-data download and one batch of concurrent
+    forecast fetches serve the whole range, and only one chunk of results is held in memory at a time.
+    """
+    calculator = SkyCalculator(site, precision)
+    nights = (end - start).days + 1
+    moon_illums = get_moon_illuminations(start + timedelta(days=i) for i in range(nights))
+    cloud_covers = get_cloud_covers(site, (start + timedelta(days=i) for i in range(nights)))
+
+    for first in range(0, nights, STREAM_CHUNK_NIGHTS):
+        dates = [start + timedelta(days=i) for i in range(first, min(first + STREAM_CHUNK_NIGHTS, nights))]
+        yield [observation_to_dict(obs) for obs in calculator.calculate_many(dates, moon_illums, cloud_covers)]
+
+def observation_to_dict(observation) -> dict:
+    # Convert to dict for JSON response
+    return {
+        "date": observation.date,
+        "sunset": observation.sunset,
+        "dark_sky": observation.dark_sky,
+        "sunrise": observation.sunrise,
+        "planets": observation.planets,
+        "stars": observation.stars,
+        "moon_illum": observation.moon_illum,
+        "sky_brightness": observation.sky_brightness,
+        "bortle": observation.bortle,
+        "visibility_score": observation.visibility_score,
+        "cloud_cover": observation.cloud_cover,
+    }
+
 @app.get("/api/observations")
+@admitted("observations", cost=requested_nights)
 def get_observation():
     """
     Expects a query parameter: ?date=YYYY-MM-DD
     Returns JSON with observation details.
+    Optional ?precision=fast answers from analytic formulae instead of the de421 ephemeris.
+    A range of nights can be requested instead with ?start=YYYY-MM-DD&end=YYYY-MM-DD.
     """
+    if "start" in request.args or "end" in request.args:
+        return get_observation_range()
+
     date_str = request.args.get("date")
 
     if not date_str:
@@ -26,25 +217,345 @@ def get_observation():
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
 
     try:
-        calculator = SkyCalculator()
-        observation = calculator.calculate(obs_date)
-        
-        # Convert to dict for JSON response
-        observation_dict = {
-            "date": observation.date,
-            "sunset": observation.sunset,
-            "dark_sky": observation.dark_sky,
-            "sunrise": observation.sunrise,
-            "planets": observation.planets,
-            "stars": observation.stars,
-            "moon_illum": observation.moon_illum,
-        }
+        site = site_from_args(request.args)
+        precision = precision_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        # Requests for the same (site, date, options) arriving together wait on one calculation
+        key = ("observation", site_key(site), obs_date.isoformat(), precision)
+        observation_dict = observation_flight.do(key, lambda: compute_observation(site, obs_date, precision))
 
         return jsonify(observation_dict)
 
     except Exception as e:
         return jsonify({"error": f"Failed to calculate observation: {str(e)}"}), 500
 
+def get_observation_range():
+    """
+    ?start=..&end=.. form of /api/observations; returns {"observations": [...]} in date order.
+    With ?stream=ndjson (one JSON object per line) or ?stream=sse (one event per chunk of nights),
+    results are sent as each chunk is computed instead of in one response at the end.
+    """
+    try:
+        start = datetime.strptime(request.args.get("start", ""), "%Y-%m-%d").date()
+        end = datetime.strptime(request.args.get("end", ""), "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Ranges need 'start' and 'end' dates in YYYY-MM-DD format."}), 400
+
+    stream = request.args.get("stream")
+    if stream not in (None, "ndjson", "sse"):
+        return jsonify({"error": "'stream' must be 'ndjson' or 'sse'."}), 400
+
+    max_nights = MAX_STREAM_NIGHTS if stream else MAX_RANGE_NIGHTS
+    if not 0 <= (end - start).days < max_nights:
+        return jsonify({"error": f"'end' must be on or after 'start' and within {max_nights} nights."}), 400
+
+    try:
+        site = site_from_args(request.args)
+        precision = precision_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if stream:
+        return stream_observations(site, start, end, stream, precision)
+
+    try:
+        return jsonify({"observations": compute_observations(site, start, end, precision)})
+    except Exception as e:
+        return jsonify({"error": f"Failed to calculate observations: {str(e)}"}), 500
+
+def admitted_chunks(chunks):
+    # Holds observation capacity only while each chunk is computed, never while a (possibly slow)
+    # client reads it, so a long stream cannot block single-date requests
+    while True:
+        with admission.admit("observations", STREAM_CHUNK_NIGHTS):
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+def stream_observations(site: Location, start, end, stream: str, precision: str = "full") -> Response:
+    # Sends each chunk as soon as it is computed; a failure (or overload) mid-range is reported in-band
+    def ndjson():
+        try:
+            for chunk in admitted_chunks(observation_chunks(site, start, end, precision)):
+                yield "".join(json.dumps(obs) + "\n" for obs in chunk)
+        except Exception as e:
+            yield json.dumps({"error": f"Failed to calculate observations: {str(e)}"}) + "\n"
+
+    def sse():
+        try:
+            for chunk in admitted_chunks(observation_chunks(site, start, end, precision)):
+                yield f"event: observations\ndata: {json.dumps(chunk)}\n\n"
+            yield "event: done\ndata: {}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    if stream == "sse":
+        response = Response(stream_with_context(sse()), mimetype="text/event-stream")
+    else:
+        response = Response(stream_with_context(ndjson()), mimetype="application/x-ndjson")
+    # Ask proxies not to buffer the stream
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
+
+@app.get("/api/targets")
+@admitted("targets")
+def get_targets():
+    """
+    Expects ?date=YYYY-MM-DD, optional ?limit=N (default 10) and ?min_alt=degrees (default 20).
+    Returns the best deep-sky targets for that night's astronomical darkness,
+    ranked by maximum altitude and magnitude. 'rise' and 'set' are when a target clears or
+    drops behind the site's skyline during darkness ("Unavailable" if that does not happen).
+    """
+    date_str = request.args.get("date")
+
+    if not date_str:
+        return jsonify({"error": "Missing 'date' query parameter."}), 400
+
+    try:
+        obs_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+
+    try:
+        limit = int(request.args.get("limit", 10))
+        min_altitude = float(request.args.get("min_alt", 20))
+        site = site_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not 1 <= limit <= MAX_TARGETS:
+        return jsonify({"error": f"'limit' must be between 1 and {MAX_TARGETS}."}), 400
+
+    try:
+        # The ranking only needs the timescale and astral's twilight times, not the ephemeris
+        calculator = SkyCalculator(site, precision="fast")
+        targets = load_catalog().top_targets(calculator, obs_date, k=limit, min_altitude=min_altitude)
+    except ValueError:
+        # astral raises ValueError when the Sun never reaches astronomical darkness
+        return jsonify({"error": "No astronomical darkness at this site on that date."}), 422
+    except Exception as e:
+        return jsonify({"error": f"Failed to rank targets: {str(e)}"}), 500
+
+    return jsonify({"date": obs_date.isoformat(), "site": site.name, "targets": targets})
+
+@app.get("/api/satellites")
+@admitted("satellites")
+def get_satellite_passes():
+    """
+    Expects ?date=YYYY-MM-DD, optional ?min_alt=degrees (default 10) and ?visible=1 to keep only
+    passes where the satellite is sunlit against a dark sky.
+    Uses the local TLE file (data/satellites.tle or $NIGHTSKY_TLE_FILE); no network access.
+    """
+    date_str = request.args.get("date")
+
+    if not date_str:
+        return jsonify({"error": "Missing 'date' query parameter."}), 400
+
+    try:
+        obs_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+
+    try:
+        min_altitude = float(request.args.get("min_alt", 10))
+        site = site_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        calculator = SkyCalculator(site)
+        passes = predict_passes(calculator, obs_date, min_altitude=min_altitude)
+    except FileNotFoundError:
+        return jsonify({"error": "No TLE file available on the server."}), 503
+    except ValueError:
+        return jsonify({"error": "The Sun does not set at this site on that date."}), 422
+    except Exception as e:
+        return jsonify({"error": f"Failed to predict satellite passes: {str(e)}"}), 500
+
+    if request.args.get("visible") == "1":
+        passes = [p for p in passes if p["visible"]]
+
+    return jsonify({"date": obs_date.isoformat(), "site": site.name, "passes": passes})
+
+@app.get("/api/chart")
+@admitted("charts")
+def get_chart():
+    """
+    Expects ?date=YYYY-MM-DD, optional ?time=HH:MM local time (default 22:00),
+    ?size=pixels (default 600) and ?format=svg|png (default svg).
+    Returns an all-sky chart of the stars, planets and Moon above the horizon.
+    Repeat views are served from memory and honour If-None-Match.
+    """
+    try:
+        obs_date = datetime.strptime(request.args.get("date", ""), "%Y-%m-%d").date()
+        clock = datetime.strptime(request.args.get("time", "22:00"), "%H:%M")
+    except ValueError:
+        return jsonify({"error": "Use ?date=YYYY-MM-DD and optionally ?time=HH:MM."}), 400
+
+    try:
+        size = int(request.args.get("size", 600))
+        site = site_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    image_format = request.args.get("format", "svg").lower()
+    if image_format not in ("svg", "png"):
+        return jsonify({"error": "'format' must be 'svg' or 'png'."}), 400
+    if not CHART_SIZES[0] <= size <= CHART_SIZES[1]:
+        return jsonify({"error": f"'size' must be between {CHART_SIZES[0]} and {CHART_SIZES[1]}."}), 400
+
+    minute = clock.minute - clock.minute % CHART_TIME_STEP
+    local_dt = datetime(obs_date.year, obs_date.month, obs_date.day, clock.hour, minute)
+    key = (site_key(site), local_dt.isoformat(), size, image_format)
+
+    entry = chart_cache.get(key)
+    if entry is None:
+        try:
+            calculator = SkyCalculator(site)
+            t = calculator.ts.from_datetime(site.tz.localize(local_dt))
+            objects = chart_objects(calculator, t)
+        except Exception as e:
+            return jsonify({"error": f"Failed to render chart: {str(e)}"}), 500
+
+        if image_format == "svg":
+            title = f"{site.name} sky, {local_dt.strftime('%Y-%m-%d %H:%M')}"
+            entry = chart_cache.put(key, render_svg(objects, size, title), "image/svg+xml")
+        else:
+            entry = chart_cache.put(key, render_png(objects, size), "image/png")
+
+    body, etag, mimetype = entry
+    response = Response(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = CHART_TIME_STEP * 60
+    return response.make_conditional(request)
+
+@app.get("/api/grid")
+@admitted("grid")
+def get_grid():
+    """
+    Expects ?date=YYYY-MM-DD and a region ?lat_min=&lat_max=&lon_min=&lon_max=, with optional
+    ?n=cells per axis (default 50), ?tz= (default America/Denver), ?object=<planet or Moon>,
+    ?time=HH:MM for the object's altitude (default 22:00), ?format=json|geojson|bin and
+    ?precision=full|fast (fast skips the ephemeris file and is usually plenty for a heat-map).
+    Returns hours of astronomical darkness (and object altitude) for every grid point, plus
+    sky brightness (SQM) when a light-pollution raster is configured (NIGHTSKY_SKY_BRIGHTNESS).
+    """
+    try:
+        obs_date = datetime.strptime(request.args.get("date", ""), "%Y-%m-%d").date()
+        clock = datetime.strptime(request.args.get("time", "22:00"), "%H:%M")
+    except ValueError:
+        return jsonify({"error": "Use ?date=YYYY-MM-DD and optionally ?time=HH:MM."}), 400
+
+    try:
+        lat_min, lat_max = float(request.args["lat_min"]), float(request.args["lat_max"])
+        lon_min, lon_max = float(request.args["lon_min"]), float(request.args["lon_max"])
+        n = int(request.args.get("n", 50))
+        tz = pytz.timezone(request.args.get("tz", "America/Denver"))
+    except (KeyError, ValueError, pytz.UnknownTimeZoneError):
+        return jsonify({"error": "Give numeric 'lat_min', 'lat_max', 'lon_min', 'lon_max', 'n' and a valid 'tz'."}), 400
+
+    try:
+        precision = precision_from_args(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if not (-90 <= lat_min <= lat_max <= 90 and -180 <= lon_min <= lon_max <= 180):
+        return jsonify({"error": "Region must satisfy lat_min <= lat_max within [-90, 90] and lon_min <= lon_max within [-180, 180]."}), 400
+    if not 1 <= n <= MAX_GRID_SIZE:
+        return jsonify({"error": f"'n' must be between 1 and {MAX_GRID_SIZE}."}), 400
+
+    target = request.args.get("object")
+    if target is not None and target != "Moon" and target not in PLANET_MAP:
+        return jsonify({"error": f"Unknown object '{target}'. Use a planet name or Moon."}), 400
+
+    image_format = request.args.get("format", "json").lower()
+    if image_format not in ("json", "geojson", "bin"):
+        return jsonify({"error": "'format' must be 'json', 'geojson' or 'bin'."}), 400
+
+    latitudes = np.linspace(lat_min, lat_max, n)
+    longitudes = np.linspace(lon_min, lon_max, n)
+
+    try:
+        fields = compute_grid(SkyCalculator(precision=precision), obs_date, latitudes, longitudes, tz,
+                              target=target, local_time=(clock.hour, clock.minute), brightness=default_raster())
+    except Exception as e:
+        return jsonify({"error": f"Failed to compute grid: {str(e)}"}), 500
+
+    if image_format == "geojson":
+        return jsonify(grid_geojson(latitudes, longitudes, fields))
+
+    if image_format == "bin":
+        response = Response(grid_binary(fields), mimetype="application/octet-stream")
+        response.headers["X-Grid-Shape"] = f"{n},{n}"
+        response.headers["X-Grid-Fields"] = ",".join(fields)
+        response.headers["X-Grid-Bounds"] = f"{lat_min},{lat_max},{lon_min},{lon_max}"
+        response.headers["Access-Control-Expose-Headers"] = "X-Grid-Shape, X-Grid-Fields, X-Grid-Bounds"
+        return response
+
+    return jsonify({
+        "date": obs_date.isoformat(),
+        "lat": np.round(latitudes, 4).tolist(),
+        "lon": np.round(longitudes, 4).tolist(),
+        **{name: rounded_list(values) for name, values in fields.items()},
+    })
+
+@app.get("/api/metrics")
+def get_metrics():
+    # Operational counters for this worker
+    return jsonify({
+        "coalescing": observation_flight.stats(),
+        "admission": admission.stats(),
+        "chart_cache": chart_cache.stats(),
+        "weather": weather_service().stats(),
+    })
+
+def admin_allowed() -> bool:
+    # Admin endpoints need the profiling token; without one configured they do not exist
+    supplied = request.headers.get(PROFILE_HEADER, "")
+    return bool(profile_store and token_matches(supplied, PROFILE_TOKEN))
+
+@app.get("/api/admin/profiles")
+def list_profiles():
+    # Stored request profiles, newest first
+    if not admin_allowed():
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"profiles": profile_store.list(), "keep": profile_store.max_profiles})
+
+@app.get("/api/admin/profiles/<profile_id>")
+def get_profile(profile_id):
+    """
+    Downloads one profile:
+      ?format=prof       cProfile/pstats file (snakeviz, pstats)
+      ?format=collapsed  collapsed stacks for flamegraph.pl or speedscope
+      ?format=tree       text call tree by cumulative time (default)
+    """
+    if not admin_allowed():
+        return jsonify({"error": "Not found"}), 404
+
+    fmt = request.args.get("format", "tree")
+    if fmt == "tree":
+        report = profile_store.call_tree(profile_id)
+        if report is None:
+            return jsonify({"error": "Unknown profile"}), 404
+        return Response(report, mimetype="text/plain")
+    if fmt not in ("prof", "collapsed"):
+        return jsonify({"error": "format must be prof, collapsed or tree"}), 400
+
+    path = profile_store.path(profile_id, fmt)
+    if path is None:
+        return jsonify({"error": "Unknown profile"}), 404
+    with open(path, "rb") as file:
+        body = file.read()
+    mimetype = "application/octet-stream" if fmt == "prof" else "text/plain"
+    return Response(body, mimetype=mimetype,
+                    headers={"Content-Disposition": f"attachment; filename={profile_id}.{fmt}"})
+
 @app.get("/")
 def home():
     return jsonify({"service": "NightSky Helper API", "status": "running"})
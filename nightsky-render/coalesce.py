@@ -0,0 +1,134 @@
+# coalesce.py - Single-flight request coalescing for NightSky Helper
+# Concurrent requests for the same key share one computation instead of each running their own
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl  # POSIX only; cross-worker coalescing is skipped where it is unavailable
+except ImportError:
+    fcntl = None
+
+class _Call:
+    # One in-flight computation that other threads can wait on
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Runs fn() once per key while it is in flight; threads asking for the same key meanwhile
+    wait and receive the same result (or exception).
+
+    If lock_dir is set, workers in other processes coordinate through a lock file per key:
+    the first worker computes and writes the JSON result next to the lock, the others block on
+    the lock and read that result instead of recomputing. Results must be JSON-serializable.
+    Waiters read a result as soon as the lock is released, so files older than file_ttl seconds
+    serve no one; each worker sweeps those out at most once per file_ttl.
+    """
+
+    def __init__(self, lock_dir: str | None = None, file_ttl: float = 300.0):
+        self.lock_dir = lock_dir if fcntl else None
+        if self.lock_dir:
+            os.makedirs(self.lock_dir, exist_ok=True)
+        self.file_ttl = file_ttl
+        self._last_sweep = time.time()
+        self._lock = threading.Lock()
+        self._calls: dict = {}
+        self._counts = {"computed": 0, "coalesced_threads": 0, "coalesced_workers": 0}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            self._count("coalesced_threads")
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._run(key, fn)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> dict:
+        # Snapshot of the counters; 'saved' is how many computations were avoided
+        with self._lock:
+            counts = dict(self._counts)
+            counts["in_flight"] = len(self._calls)
+        counts["saved"] = counts["coalesced_threads"] + counts["coalesced_workers"]
+        return counts
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _run(self, key, fn):
+        if not self.lock_dir:
+            self._count("computed")
+            return fn()
+
+        base = os.path.join(self.lock_dir, hashlib.sha1(repr(key).encode()).hexdigest())
+        waiting_since = time.time()
+
+        with open(base + ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                # A result written after we started waiting was computed for a request just like ours
+                try:
+                    if os.path.getmtime(base + ".json") >= waiting_since:
+                        with open(base + ".json", "r", encoding="utf-8") as file:
+                            result = json.load(file)
+                        self._count("coalesced_workers")
+                        return result
+                except (OSError, ValueError):
+                    pass
+
+                self._count("computed")
+                result = fn()
+                tmp_name = f"{base}.{os.getpid()}.tmp"
+                with open(tmp_name, "w", encoding="utf-8") as file:
+                    json.dump(result, file)
+                os.replace(tmp_name, base + ".json")
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        if time.time() - self._last_sweep >= self.file_ttl:
+            self._sweep()
+        return result
+
+    def _sweep(self):
+        # Remove lock, result and leftover temp files for keys nobody has asked for in file_ttl seconds
+        self._last_sweep = now = time.time()
+        try:
+            entries = list(os.scandir(self.lock_dir))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if now - entry.stat().st_mtime < self.file_ttl:
+                    continue
+                if not entry.name.endswith(".lock"):
+                    os.remove(entry.path)
+                    continue
+                # Waiters reopen (and so touch) the lock file; only unlink one nobody holds right now
+                with open(entry.path, "a") as lock_file:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    os.remove(entry.path)
+            except OSError:
+                pass  # gone already, or in use again
@@ -0,0 +1,143 @@
+# dso_catalog.py - Deep-sky object catalog and target ranking for NightSky Helper
+# Loads the bundled Messier/bright NGC list into NumPy columns and ranks the whole catalog
+# for one night in a single batched pass (no per-object Skyfield calls)
+
+import csv
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+import numpy as np
+from location import format_time
+from sky_math import SIDEREAL_RATE, precess_to_date, local_sidereal_hours, altaz, airmass
+from horizon import horizon_crossings
+
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "deep_sky.csv")
+
+# Ranking weight: one magnitude of brightness is worth this many degrees of altitude
+MAGNITUDE_WEIGHT = 5.0
+
+# Spacing (minutes) of the shared time grid used to find rise/set against the site's skyline
+HORIZON_STEP_MINUTES = 5
+
+class DeepSkyCatalog:
+    # Column-oriented catalog: one NumPy array per field, one row per object
+    def __init__(self, ids, names, types, ra_hours, dec_degrees, magnitudes):
+        self.ids = np.asarray(ids, dtype=object)
+        self.names = np.asarray(names, dtype=object)
+        self.types = np.asarray(types, dtype=object)
+        self.ra_hours = np.asarray(ra_hours, dtype=float)
+        self.dec_degrees = np.asarray(dec_degrees, dtype=float)
+        self.magnitudes = np.asarray(magnitudes, dtype=float)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_csv(cls, filename: str):
+        # CSV columns: id,name,type,ra_hours,dec_degrees,magnitude (J2000 coordinates)
+        with open(filename, 'r', newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+        return cls(
+            ids=[row['id'] for row in rows],
+            names=[row['name'] or row['id'] for row in rows],
+            types=[row['type'] for row in rows],
+            ra_hours=[float(row['ra_hours']) for row in rows],
+            dec_degrees=[float(row['dec_degrees']) for row in rows],
+            magnitudes=[float(row['magnitude']) for row in rows]
+        )
+
+    def night_summary(self, calculator, obs_date: date) -> dict:
+        """
+        Computes, for every object at once, the maximum altitude, the time of that maximum,
+        the meridian transit, the minimum airmass, and when the object rises above or sets below
+        the site's horizon mask during the astronomical dark window.
+        Times are returned as hours after the start of darkness.
+        """
+        dark_start, dark_end = calculator.dark_window(obs_date)
+        window_hours = (dark_end - dark_start).total_seconds() / 3600.0
+
+        ts = calculator.ts
+        t_start = ts.from_datetime(dark_start)
+        t_end = ts.from_datetime(dark_end)
+        t_mid = ts.tt_jd((t_start.tt + t_end.tt) / 2.0)
+
+        # Precession/nutation drift is negligible across one night, so one matrix at mid-darkness is enough
+        ra, dec = precess_to_date(self.ra_hours, self.dec_degrees, t_mid)
+        observer = calculator.observer
+
+        # Hours until each object crosses the meridian (hour angle 0)
+        lst_start = local_sidereal_hours(t_start, observer.longitude)
+        transit_hours = ((ra - lst_start) % 24.0) / SIDEREAL_RATE
+        transits = transit_hours <= window_hours
+
+        # Altitude falls monotonically away from transit, so the nightly maximum is either the
+        # transit altitude or the higher of the two window edges
+        lst_end = local_sidereal_hours(t_end, observer.longitude)
+        alt_start, _ = altaz(lst_start, ra, dec, observer.latitude)
+        alt_end, _ = altaz(lst_end, ra, dec, observer.latitude)
+        alt_transit = 90.0 - np.abs(observer.latitude - dec)
+
+        edge_best = np.where(alt_start >= alt_end, 0.0, window_hours)
+        max_altitude = np.where(transits, alt_transit, np.maximum(alt_start, alt_end))
+        best_hours = np.where(transits, transit_hours, edge_best)
+
+        # The skyline varies with azimuth, so rise/set come from one (objects, times) grid compared
+        # against the mask's lookup table, rather than a root search per object
+        hours = np.linspace(0.0, window_hours, max(2, int(window_hours * 60 / HORIZON_STEP_MINUTES) + 1))
+        lst = (lst_start + hours * SIDEREAL_RATE) % 24.0
+        alt, az = altaz(lst[None, :], ra[:, None], dec[:, None], observer.latitude)
+        rise_hours, set_hours = horizon_crossings(hours, alt - observer.horizon_limit(az))
+
+        return {
+            'dark_start': dark_start,
+            'dark_end': dark_end,
+            'max_altitude': max_altitude,
+            'best_hours': best_hours,
+            'transit_hours': np.where(transits, transit_hours, np.nan),
+            'min_airmass': airmass(max_altitude),
+            'rise_hours': rise_hours,
+            'set_hours': set_hours
+        }
+
+    def top_targets(self, calculator, obs_date: date, k: int = 10, min_altitude: float = 20.0) -> list[dict]:
+        # Rank the catalog for one night: high in the sky first, brighter breaks near-ties
+        summary = self.night_summary(calculator, obs_date)
+        max_altitude = summary['max_altitude']
+
+        score = max_altitude - MAGNITUDE_WEIGHT * self.magnitudes
+        score = np.where(max_altitude >= min_altitude, score, -np.inf)
+        candidates = np.flatnonzero(np.isfinite(score))
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-score[candidates], k - 1)[:k]]
+        order = candidates[np.argsort(-score[candidates], kind='stable')]
+
+        dark_start = summary['dark_start']
+
+        def clock(hours):
+            # Hours after dark -> formatted local time ("Unavailable" when it does not happen tonight)
+            return format_time(None if np.isnan(hours) else dark_start + timedelta(hours=float(hours)))
+
+        def rounded(value, digits):
+            # NaN (e.g. airmass below the horizon) is not valid JSON
+            return None if np.isnan(value) else round(float(value), digits)
+
+        targets = []
+        for i in order:
+            targets.append({
+                'id': self.ids[i],
+                'name': self.names[i],
+                'type': self.types[i],
+                'magnitude': float(self.magnitudes[i]),
+                'max_altitude': round(float(max_altitude[i]), 1),
+                'best_time': format_time(dark_start + timedelta(hours=float(summary['best_hours'][i]))),
+                'transit': clock(summary['transit_hours'][i]),
+                'rise': clock(summary['rise_hours'][i]),
+                'set': clock(summary['set_hours'][i]),
+                'min_airmass': rounded(summary['min_airmass'][i], 2)
+            })
+        return targets
+
+@lru_cache(maxsize=4)
+def load_catalog(filename: str = DEFAULT_CATALOG) -> DeepSkyCatalog:
+    # Parsed catalogs are cached per process; the CSV is only read once
+    return DeepSkyCatalog.from_csv(filename)
@@ -0,0 +1,173 @@
+# fast_engine.py - Low-precision analytic sky engine for NightSky Helper
+# Pure NumPy Sun, Moon and planet positions (no SPK ephemeris file) for batch and grid workloads
+# where small positional errors do not change the answer. Valid roughly 1800-2050.
+# Measured against astral and de421 in FAST_MODE_VALIDATION.md (regenerate with validate_fast.py):
+# 10 PM altitudes within 0.5 degrees (planets and stars within 0.35), Sun events within 0.3 minutes
+# away from the polar transitions.
+
+import numpy as np
+
+J2000 = 2451545.0
+
+# Altitudes that define the events reported by SkyCalculator (same conventions as astral)
+SUNRISE_ALTITUDE = -0.833
+ASTRONOMICAL_ALTITUDE = -18.0
+
+# Keplerian elements and rates per Julian century, J2000 ecliptic and equinox (Standish, JPL
+# "Approximate Positions of the Planets", Table 1, 1800-2050):
+# a (au), e, I, L, longitude of perihelion, longitude of ascending node (degrees)
+PLANET_ELEMENTS = {
+    'Mercury': ((0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+                (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081)),
+    'Venus': ((0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+              (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418)),
+    'Earth': ((1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+              (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0)),
+    'Mars': ((1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+             (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343)),
+    'Jupiter': ((5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+                (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106)),
+    'Saturn': ((9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+               (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794)),
+    'Uranus': ((19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+               (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589)),
+    'Neptune': ((30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+                (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664)),
+}
+
+OBLIQUITY_J2000 = 23.43928
+
+def julian_date(timestamps):
+    # Unix timestamps (seconds, UTC) -> Julian dates
+    return 2440587.5 + np.asarray(timestamps, dtype=float) / 86400.0
+
+def _centuries(jd):
+    return (np.asarray(jd, dtype=float) - J2000) / 36525.0
+
+def gmst_hours(jd):
+    # Greenwich mean sidereal time (IAU 1982), good to well under a second for this purpose
+    d = np.asarray(jd, dtype=float) - J2000
+    t = d / 36525.0
+    return (280.46061837 + 360.98564736629 * d + 0.000387933 * t ** 2) / 15.0 % 24.0
+
+def _ecliptic_to_equatorial(lon, lat, obliquity):
+    # Ecliptic longitude/latitude (degrees) -> RA (hours) / Dec (degrees)
+    lon, lat, eps = np.radians(lon), np.radians(lat), np.radians(obliquity)
+    ra = np.arctan2(np.sin(lon) * np.cos(eps) - np.tan(lat) * np.sin(eps), np.cos(lon))
+    dec = np.arcsin(np.sin(lat) * np.cos(eps) + np.cos(lat) * np.sin(eps) * np.sin(lon))
+    return np.degrees(ra) / 15.0 % 24.0, np.degrees(dec)
+
+def precession_matrix(jd):
+    # IAU 1976 precession from J2000 to the mean equator/equinox of date; shape (..., 3, 3)
+    t = _centuries(jd)
+    arcsec = np.pi / (180.0 * 3600.0)
+    zeta = (2306.2181 * t + 0.30188 * t ** 2 + 0.017998 * t ** 3) * arcsec
+    z = (2306.2181 * t + 1.09468 * t ** 2 + 0.018203 * t ** 3) * arcsec
+    theta = (2004.3109 * t - 0.42665 * t ** 2 - 0.041833 * t ** 3) * arcsec
+    cz, sz, ct, st, cZ, sZ = np.cos(zeta), np.sin(zeta), np.cos(theta), np.sin(theta), np.cos(z), np.sin(z)
+    return np.stack([
+        np.stack([cz * ct * cZ - sz * sZ, -sz * ct * cZ - cz * sZ, -st * cZ], axis=-1),
+        np.stack([cz * ct * sZ + sz * cZ, -sz * ct * sZ + cz * cZ, -st * sZ], axis=-1),
+        np.stack([cz * st, -sz * st, ct], axis=-1),
+    ], axis=-2)
+
+def precess(ra_hours, dec_degrees, jd):
+    # J2000 RA/Dec -> mean RA/Dec of date (precession only, nutation ignored: < 20 arcseconds)
+    ra, dec = np.radians(np.asarray(ra_hours) * 15.0), np.radians(dec_degrees)
+    v = np.stack([np.cos(dec) * np.cos(ra), np.cos(dec) * np.sin(ra), np.sin(dec)], axis=-1)
+    v = np.einsum('...ij,...j->...i', precession_matrix(jd), v)
+    return np.degrees(np.arctan2(v[..., 1], v[..., 0])) / 15.0 % 24.0, np.degrees(np.arcsin(np.clip(v[..., 2], -1, 1)))
+
+def sun_radec(jd):
+    # Astronomical Almanac low-precision Sun (about 0.01 degree), equinox of date
+    n = np.asarray(jd, dtype=float) - J2000
+    mean_lon = 280.460 + 0.9856474 * n
+    g = np.radians(357.528 + 0.9856003 * n)
+    lon = mean_lon + 1.915 * np.sin(g) + 0.020 * np.sin(2 * g)
+    return _ecliptic_to_equatorial(lon, 0.0, 23.439 - 0.0000004 * n)
+
+def moon_radec(jd):
+    # Astronomical Almanac low-precision Moon (about 0.3 degree), geocentric, equinox of date.
+    # Also returns the horizontal parallax (degrees) so callers can correct to the topocentric altitude.
+    t = _centuries(jd)
+    s = lambda a, b: np.sin(np.radians(a + b * t))
+    c = lambda a, b: np.cos(np.radians(a + b * t))
+    lon = (218.32 + 481267.881 * t + 6.29 * s(135.0, 477198.87) - 1.27 * s(259.3, -413335.36)
+           + 0.66 * s(235.7, 890534.22) + 0.21 * s(269.9, 954397.74)
+           - 0.19 * s(357.5, 35999.05) - 0.11 * s(186.5, 966404.03))
+    lat = (5.13 * s(93.3, 483202.02) + 0.28 * s(228.2, 960400.89)
+           - 0.28 * s(318.3, 6003.15) - 0.17 * s(217.6, -407332.21))
+    parallax = (0.9508 + 0.0518 * c(135.0, 477198.87) + 0.0095 * c(259.3, -413335.36)
+                + 0.0078 * c(235.7, 890534.22) + 0.0028 * c(269.9, 954397.74))
+    ra, dec = _ecliptic_to_equatorial(lon, lat, 23.439 - 0.013 * t)
+    return ra, dec, parallax
+
+def _heliocentric(names, t):
+    # Heliocentric J2000 ecliptic xyz (au) for each planet name x each time: shape (planets, times, 3)
+    base = np.array([PLANET_ELEMENTS[name][0] for name in names])[:, None, :]
+    rate = np.array([PLANET_ELEMENTS[name][1] for name in names])[:, None, :]
+    a, e, inc, mean_lon, peri, node = np.moveaxis(base + rate * t[None, :, None], -1, 0)
+
+    # Solve Kepler's equation E - e sin E = M with a few Newton steps (e < 0.21 converges fast)
+    m = np.radians((mean_lon - peri + 180.0) % 360.0 - 180.0)
+    ecc = m + e * np.sin(m)
+    for _ in range(5):
+        ecc -= (ecc - e * np.sin(ecc) - m) / (1 - e * np.cos(ecc))
+
+    x_orb = a * (np.cos(ecc) - e)
+    y_orb = a * np.sqrt(1 - e ** 2) * np.sin(ecc)
+
+    w, o, i = np.radians(peri - node), np.radians(node), np.radians(inc)
+    x = (np.cos(w) * np.cos(o) - np.sin(w) * np.sin(o) * np.cos(i)) * x_orb + (-np.sin(w) * np.cos(o) - np.cos(w) * np.sin(o) * np.cos(i)) * y_orb
+    y = (np.cos(w) * np.sin(o) + np.sin(w) * np.cos(o) * np.cos(i)) * x_orb + (-np.sin(w) * np.sin(o) + np.cos(w) * np.cos(o) * np.cos(i)) * y_orb
+    z = np.sin(w) * np.sin(i) * x_orb + np.cos(w) * np.sin(i) * y_orb
+    return np.stack([x, y, z], axis=-1)
+
+def planet_radec(names, jd):
+    # Geocentric RA (hours) / Dec (degrees) of date for each planet name x each time: shape (planets, times)
+    t = np.atleast_1d(_centuries(jd))
+    geo = _heliocentric(names, t) - _heliocentric(['Earth'], t)
+    lon = np.degrees(np.arctan2(geo[..., 1], geo[..., 0]))
+    lat = np.degrees(np.arctan2(geo[..., 2], np.hypot(geo[..., 0], geo[..., 1])))
+    ra, dec = _ecliptic_to_equatorial(lon, lat, OBLIQUITY_J2000)
+    return precess(ra, dec, np.atleast_1d(jd)[None, :])
+
+def altitude(ra_hours, dec_degrees, jd, latitude, longitude):
+    # Altitude (degrees) from RA/Dec of date; all arguments broadcast
+    hour_angle = np.radians((gmst_hours(jd) + longitude / 15.0 - ra_hours) * 15.0)
+    lat, dec = np.radians(latitude), np.radians(dec_degrees)
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    return np.degrees(np.arcsin(np.clip(sin_alt, -1.0, 1.0)))
+
+def _crossings(jd, alt, threshold, rising: bool, last: bool = False):
+    # First (or last) crossing of threshold along the last axis, linearly interpolated; NaN where there is none
+    above = alt > threshold
+    hits = (~above[..., :-1] & above[..., 1:]) if rising else (above[..., :-1] & ~above[..., 1:])
+    found = hits.any(axis=-1)
+    if last:
+        i = hits.shape[-1] - 1 - np.argmax(hits[..., ::-1], axis=-1)
+    else:
+        i = np.argmax(hits, axis=-1)
+    a0 = np.take_along_axis(alt, i[..., None], axis=-1)[..., 0]
+    a1 = np.take_along_axis(alt, i[..., None] + 1, axis=-1)[..., 0]
+    j0 = np.take_along_axis(jd, i[..., None], axis=-1)[..., 0]
+    j1 = np.take_along_axis(jd, i[..., None] + 1, axis=-1)[..., 0]
+    crossing = j0 + (threshold - a0) / (a1 - a0) * (j1 - j0)
+    return np.where(found, crossing, np.nan)
+
+def sun_events(jd_midnight, latitude, longitude, step_minutes: float = 2.0) -> dict:
+    """
+    For each local midnight (Julian date array), the sunrise that morning and the sunset and
+    end of astronomical twilight that evening, searched over the following 24 hours.
+    Matches the events the full path takes from astral: when a date has two crossings (a previous
+    evening's twilight ending just after midnight), the evening one is reported. Missing events are NaN.
+    """
+    steps = np.arange(0.0, 24 * 60 + step_minutes, step_minutes) / 1440.0
+    jd = np.asarray(jd_midnight, dtype=float)[:, None] + steps[None, :]
+    ra, dec = sun_radec(jd)
+    alt = altitude(ra, dec, jd, latitude, longitude)
+    return {
+        'sunrise': _crossings(jd, alt, SUNRISE_ALTITUDE, rising=True),
+        'sunset': _crossings(jd, alt, SUNRISE_ALTITUDE, rising=False, last=True),
+        'dark_start': _crossings(jd, alt, ASTRONOMICAL_ALTITUDE, rising=False, last=True),
+    }
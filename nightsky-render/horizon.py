@@ -0,0 +1,106 @@
+# horizon.py - Site horizon masks for NightSky Helper
+# The altitude of the local skyline (mountains, trees, buildings) as a function of azimuth,
+# precomputed into a dense lookup table so visibility checks compare whole arrays at once
+
+import csv
+import json
+import os
+import numpy as np
+
+HORIZONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "horizons")
+
+# Earth radius, and the effective radius for sight lines bent by standard refraction (k = 0.13)
+EARTH_RADIUS_KM = 6371.0
+EFFECTIVE_RADIUS_KM = EARTH_RADIUS_KM / (1 - 0.13)
+
+class HorizonMask:
+    """
+    Altitude limit (degrees) for every azimuth, stored at RESOLUTION-degree steps.
+    Built from (azimuth, altitude) points by linear interpolation around the full circle.
+    """
+    RESOLUTION = 0.1
+
+    def __init__(self, azimuths, altitudes, name: str = ""):
+        azimuths = np.asarray(azimuths, dtype=float) % 360.0
+        altitudes = np.asarray(altitudes, dtype=float)
+        order = np.argsort(azimuths)
+        grid = np.arange(0.0, 360.0, self.RESOLUTION)
+        self.name = name
+        self.table = np.interp(grid, azimuths[order], altitudes[order], period=360.0)
+
+    def limit(self, azimuths):
+        # Skyline altitude at each azimuth (any array shape): one table index per value
+        index = np.rint(np.asarray(azimuths, dtype=float) / self.RESOLUTION).astype(int) % len(self.table)
+        return self.table[index]
+
+    @classmethod
+    def from_csv(cls, filename: str):
+        # CSV columns: azimuth,altitude (degrees); lines starting with '#' are comments
+        with open(filename, 'r', newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(line for line in file if not line.startswith('#')))
+        return cls(
+            [float(row['azimuth']) for row in rows],
+            [float(row['altitude']) for row in rows],
+            name=os.path.splitext(os.path.basename(filename))[0]
+        )
+
+    @classmethod
+    def from_elevation(cls, elevations: np.ndarray, north: float, west: float, cell_degrees: float,
+                       latitude: float, longitude: float, observer_height: float = 2.0,
+                       max_distance_km: float = 150.0, step_km: float = 0.25, azimuth_step: float = 0.5):
+        """
+        Derives the skyline from an elevation raster (metres; row 0 at `north`, column 0 at `west`,
+        square cells of cell_degrees). Every azimuth ray is sampled out to max_distance_km in one
+        array operation; the mask is the highest elevation angle along each ray, allowing for the
+        Earth's curvature and standard refraction. Samples outside the raster are ignored.
+        """
+        def sample(lats, lons):
+            rows = np.rint((north - lats) / cell_degrees).astype(int)
+            cols = np.rint((lons - west) / cell_degrees).astype(int)
+            inside = (rows >= 0) & (rows < elevations.shape[0]) & (cols >= 0) & (cols < elevations.shape[1])
+            values = np.full(lats.shape, np.nan)
+            values[inside] = elevations[rows[inside], cols[inside]]
+            return values
+
+        eye = sample(np.array(latitude), np.array(longitude))
+        eye = (0.0 if np.isnan(eye) else float(eye)) + observer_height
+
+        azimuths = np.arange(0.0, 360.0, azimuth_step)
+        distances = np.arange(step_km, max_distance_km + step_km, step_km)
+        az = np.radians(azimuths)[:, None]
+        angular = distances[None, :] / EARTH_RADIUS_KM
+        lats = latitude + np.degrees(angular * np.cos(az))
+        lons = longitude + np.degrees(angular * np.sin(az)) / np.cos(np.radians(latitude))
+
+        # Height above the observer's eye, less the drop of the curved (refracted) sight line
+        rise_m = sample(lats, lons) - eye - (distances ** 2 / (2 * EFFECTIVE_RADIUS_KM) * 1000.0)[None, :]
+        angles = np.degrees(np.arctan2(rise_m, distances[None, :] * 1000.0))
+        with np.errstate(all='ignore'):
+            altitudes = np.nanmax(np.where(np.isnan(angles), -np.inf, angles), axis=1)
+        return cls(azimuths, np.where(np.isfinite(altitudes), altitudes, 0.0), name="elevation")
+
+    @classmethod
+    def from_elevation_file(cls, filename: str, latitude: float, longitude: float, **options):
+        # <name>.npy raster plus a <name>.json sidecar with "north", "west" and "cell_degrees"
+        with open(os.path.splitext(filename)[0] + ".json", 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        elevations = np.load(filename, mmap_mode='r')
+        return cls.from_elevation(elevations, meta['north'], meta['west'], meta['cell_degrees'],
+                                  latitude, longitude, **options)
+
+def horizon_crossings(hours, margin):
+    """
+    First rise and first set along the last axis of `margin` (altitude minus skyline limit),
+    sampled at `hours`, linearly interpolated. NaN where the crossing does not happen.
+    """
+    up = margin > 0
+    results = []
+    for hits in (~up[..., :-1] & up[..., 1:], up[..., :-1] & ~up[..., 1:]):
+        i = np.argmax(hits, axis=-1)[..., None]
+        m0 = np.take_along_axis(margin, i, axis=-1)[..., 0]
+        m1 = np.take_along_axis(margin, i + 1, axis=-1)[..., 0]
+        h0, h1 = hours[i[..., 0]], hours[i[..., 0] + 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            crossing = h0 + m0 / (m0 - m1) * (h1 - h0)
+        results.append(np.where(hits.any(axis=-1), crossing, np.nan))
+    return tuple(results)
@@ -0,0 +1,245 @@
+# loadtest.py - Local load-testing harness for the NightSky Helper API
+# Replays a mix of /api/observations traffic (single dates, ranges and a hot set of repeated dates)
+# at a fixed concurrency, against the Flask test client or a locally started gunicorn, with the moon
+# data and cloud-cover forecasts served by local stubs so no network is needed. Reports throughput
+# and p50/p95/p99 latency per traffic kind and saves the results as JSON so runs can be compared.
+#
+# Usage:
+#   python loadtest.py [--mode client|gunicorn] [--concurrency 8] [--requests 400] [--precision full|fast]
+#                      [--workers 2] [--output loadtest-results/<time>.json] [--compare previous.json]
+# The full precision still needs de421.bsp on disk; --precision fast needs no ephemeris file at all.
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from weather_stub import start_weather_stub
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Share of requests per traffic kind, and how they are shaped
+TRAFFIC_MIX = {"single": 0.6, "range": 0.2, "repeat": 0.2}
+RANGE_NIGHTS = (7, 31)
+HOT_DATES = 5
+
+# Reference new moon (2000-01-06 18:14 UTC) and mean synodic month, for the stub's illumination data
+NEW_MOON_JD = 2451550.26
+SYNODIC_MONTH = 29.530588853
+
+def stub_moon_csv(first_year: int = 1800, last_year: int = 2050) -> bytes:
+    # Same layout as the real source (date,illumination_fraction), from the mean lunar phase
+    day = date(first_year, 1, 1)
+    lines = ["date,illumination"]
+    while day.year <= last_year:
+        phase = ((day.toordinal() + 1721424.5 - NEW_MOON_JD) / SYNODIC_MONTH) % 1.0
+        lines.append(f"{day.isoformat()},{(1 - math.cos(2 * math.pi * phase)) / 2:.4f}")
+        day += timedelta(days=1)
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def start_moon_stub() -> ThreadingHTTPServer:
+    # Serves the stub CSV at any path on a free local port, from a background thread
+    body = stub_moon_csv()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/csv")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # keep the report readable
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def build_requests(count: int, precision: str, seed: int) -> list[tuple]:
+    # (kind, path) pairs drawn from TRAFFIC_MIX; dates fall within the coming year
+    rng = random.Random(seed)
+    today = date.today()
+    hot = [today + timedelta(days=rng.randrange(365)) for _ in range(HOT_DATES)]
+    kinds, weights = zip(*TRAFFIC_MIX.items())
+
+    plan = []
+    for kind in rng.choices(kinds, weights=weights, k=count):
+        if kind == "single":
+            query = f"date={today + timedelta(days=rng.randrange(365))}"
+        elif kind == "repeat":
+            query = f"date={rng.choice(hot)}"
+        else:
+            start = today + timedelta(days=rng.randrange(365))
+            query = f"start={start}&end={start + timedelta(days=rng.randint(*RANGE_NIGHTS) - 1)}"
+        plan.append((kind, f"/api/observations?{query}&precision={precision}"))
+    return plan
+
+def client_sender():
+    # One Flask test client per thread; the app is imported after NIGHTSKY_MOON_URL is set
+    sys.path.insert(0, HERE)
+    from app import app
+    local = threading.local()
+
+    def send(path):
+        if not hasattr(local, "client"):
+            local.client = app.test_client()
+        response = local.client.get(path)
+        response.get_data()
+        response.close()
+        return response.status_code
+    return send
+
+def start_gunicorn(workers: int, port: int, env: dict) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-w", str(workers), "-b", f"127.0.0.1:{port}", "app:app"],
+        cwd=HERE, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    import requests
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("gunicorn exited during startup")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("gunicorn did not start within 30 seconds")
+
+def http_sender(base_url: str):
+    # One pooled requests.Session per thread
+    import requests
+    local = threading.local()
+
+    def send(path):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session.get(base_url + path, timeout=120).status_code
+    return send
+
+def run_load(send, plan: list, concurrency: int) -> tuple[list, float]:
+    # Closed loop: each thread takes the next planned request as soon as its previous one finishes
+    samples = []
+    lock = threading.Lock()
+    position = iter(plan)
+
+    def worker():
+        while True:
+            with lock:
+                item = next(position, None)
+            if item is None:
+                return
+            kind, path = item
+            started = time.perf_counter()
+            try:
+                status = send(path)
+            except Exception:
+                status = None  # connection errors count as failures
+            elapsed = time.perf_counter() - started
+            with lock:
+                samples.append((kind, status, elapsed))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+def summarize(samples: list, wall_seconds: float) -> dict:
+    # Per traffic kind plus "all": count, errors, status counts, throughput and latency percentiles (ms)
+    report = {}
+    for kind in list(TRAFFIC_MIX) + ["all"]:
+        rows = [s for s in samples if kind == "all" or s[0] == kind]
+        if not rows:
+            continue
+        latencies = np.array([elapsed for _, _, elapsed in rows]) * 1000
+        statuses = {}
+        for _, status, _ in rows:
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+        report[kind] = {
+            "requests": len(rows),
+            "errors": sum(1 for _, status, _ in rows if status != 200),
+            "statuses": statuses,
+            "throughput_rps": round(len(rows) / wall_seconds, 2),
+            "p50_ms": round(float(np.percentile(latencies, 50)), 1),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 1),
+            "p99_ms": round(float(np.percentile(latencies, 99)), 1),
+        }
+    return report
+
+def print_report(report: dict, previous: dict | None = None):
+    print(f"{'kind':<8}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for kind, row in report.items():
+        print(f"{kind:<8}{row['requests']:>9}{row['errors']:>8}{row['throughput_rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}")
+        old = (previous or {}).get(kind)
+        if old:
+            # Change against the earlier run, as a percentage
+            deltas = [f"{metric} {100 * (row[metric] - old[metric]) / old[metric]:+.0f}%"
+                      for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms") if old[metric]]
+            print(f"{'':<8}vs previous: {', '.join(deltas)}")
+
+def main():
+    parser = argparse.ArgumentParser(description="NightSky Helper load-testing harness")
+    parser.add_argument("--mode", choices=("client", "gunicorn"), default="client")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--precision", choices=("full", "fast"), default="full")
+    parser.add_argument("--workers", type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765, help="gunicorn port")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--weather-delay-ms", type=float, default=0.0, help="latency added by the stub forecast server")
+    parser.add_argument("--output", help="results JSON (default: loadtest-results/<time>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    moon_stub = start_moon_stub()
+    os.environ["NIGHTSKY_MOON_URL"] = f"http://127.0.0.1:{moon_stub.server_address[1]}/moon.csv"
+    weather_stub = start_weather_stub(delay_ms=args.weather_delay_ms)
+    os.environ["NIGHTSKY_WEATHER_PROVIDER"] = "open-meteo"
+    os.environ["NIGHTSKY_WEATHER_URL"] = f"http://127.0.0.1:{weather_stub.server_address[1]}"
+    plan = build_requests(args.requests, args.precision, args.seed)
+
+    gunicorn = None
+    try:
+        if args.mode == "gunicorn":
+            gunicorn = start_gunicorn(args.workers, args.port, dict(os.environ))
+            send = http_sender(f"http://127.0.0.1:{args.port}")
+        else:
+            send = client_sender()
+        samples, wall_seconds = run_load(send, plan, args.concurrency)
+    finally:
+        if gunicorn:
+            gunicorn.terminate()
+            gunicorn.wait()
+        moon_stub.shutdown()
+        weather_stub.shutdown()
+
+    report = summarize(samples, wall_seconds)
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)["results"]
+    print_report(report, previous)
+
+    output = args.output or os.path.join("loadtest-results", datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    config = {k: v for k, v in vars(args).items() if k not in ("output", "compare")}
+    with open(output, "w", encoding="utf-8") as file:
+        json.dump({"config": {**config, "mix": TRAFFIC_MIX, "wall_seconds": round(wall_seconds, 2)},
+                   "results": report}, file, indent=2)
+    print(f"Results saved to '{output}'.")
+
+if __name__ == "__main__":
+    main()
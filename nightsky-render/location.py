@@ -2,16 +2,32 @@
 # Location and timezone handling, Location class, Denver subclass
 
 # Import modules to support program execution
+import os
 from skyfield.api import Topos
 import pytz
+from horizon import HorizonMask, HORIZONS_DIR
+from sky_brightness import site_sky_brightness
 
 # Base Location class
 class Location:
-    def __init__(self, latitude: float, longitude: float, tz_name: str):
+    def __init__(self, latitude: float, longitude: float, tz_name: str, name: str = "Custom site",
+                 horizon: HorizonMask | None = None, sky_brightness: float | None = None):
+        self.name = name
         self.latitude = latitude
         self.longitude = longitude
         self.tz = pytz.timezone(tz_name)
         self.topos = Topos(latitude_degrees=latitude, longitude_degrees=longitude)
+        self.horizon = horizon  # local skyline; None means a flat 0 degree horizon
+        # Zenith sky brightness in mag/arcsec^2 (SQM); looked up in the light-pollution raster if not given
+        self.sky_brightness = sky_brightness if sky_brightness is not None else site_sky_brightness(latitude, longitude)
+
+    def horizon_limit(self, azimuths):
+        # Lowest visible altitude at each azimuth (array-friendly)
+        return self.horizon.limit(azimuths) if self.horizon else 0.0
+
+    def above_horizon(self, altitudes, azimuths):
+        # True where an object clears this site's horizon (array-friendly)
+        return altitudes > self.horizon_limit(azimuths)
 
     # Method to allow overriding
     def description(self):
@@ -21,7 +37,8 @@ class Location:
 class Denver(Location):
     # Variables for Denver coordinates
     def __init__(self):
-        super().__init__(latitude=39.7392, longitude=-104.9903, tz_name='America/Denver')
+        super().__init__(latitude=39.7392, longitude=-104.9903, tz_name='America/Denver', name='Denver',
+                         horizon=HorizonMask.from_csv(os.path.join(HORIZONS_DIR, 'denver.csv')))
 
     # Override description to show Denver-specific coordinates
     def description(self):
@@ -30,9 +47,14 @@ class Denver(Location):
 # Singleton Denver instance for simplicity
 DENVER = Denver()
 
-def to_utc(local_dt):
-    # Convert localized datetime to UTC
-    return DENVER.tz.localize(local_dt).astimezone(pytz.utc)
+# Named sites that can be requested by key (e.g. ?site=denver)
+SITES = {
+    'denver': DENVER
+}
+
+def to_utc(local_dt, tz=DENVER.tz):
+    # Convert localized datetime to UTC (defaults to Denver time)
+    return tz.localize(local_dt).astimezone(pytz.utc)
 
 def format_time(dt):
     # Formatted time for clean output (12-hour format with AM/PM and no leading zeroes)
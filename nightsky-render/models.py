@@ -3,7 +3,7 @@
 
 # Import modules to support program execution
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional
 
 @dataclass
 class Observation:
@@ -13,4 +13,8 @@ class Observation:
     sunrise: str
     planets: List[str]
     stars: List[str]
-    moon_illum: str = "N/A" # default value
\ No newline at end of file
+    moon_illum: str = "N/A" # default value
+    sky_brightness: Optional[float] = None # SQM, mag/arcsec^2 (None without a light-pollution raster)
+    bortle: Optional[int] = None
+    visibility_score: Optional[float] = None # 0-10, see sky_brightness.visibility_score()
+    cloud_cover: Optional[int] = None # percent at 10 PM from the forecast provider (None without a forecast)
\ No newline at end of file
@@ -2,15 +2,22 @@
 # Advanced feature - web scraping Moon Illumination data for user input date from a CSV source
 
 # Import modules to support program execution
+import os
 import requests
 from datetime import datetime
 
+# Moon illumination source; NIGHTSKY_MOON_URL points it elsewhere (e.g. loadtest.py's local stub server)
+MOON_DATA_URL = os.environ.get(
+    "NIGHTSKY_MOON_URL",
+    "https://raw.githubusercontent.com/isaacbernat/moon-data/main/moon_phases_UTC_1800-2050.csv"
+)
+
 def get_moon_illumination(user_date: datetime.date) -> str:
     """
     Scrapes the moon illumination percentage for the given date from a CSV file.
     Returns a string like '45%' or 'N/A' if not found.
     """
-    url = "https://raw.githubusercontent.com/isaacbernat/moon-data/main/moon_phases_UTC_1800-2050.csv"
+    url = MOON_DATA_URL
 
     try:
         resp = requests.get(url)
@@ -35,4 +42,30 @@ def get_moon_illumination(user_date: datetime.date) -> str:
         except ValueError:
             continue
 
-    return "N/A"
\ No newline at end of file
+    return "N/A"
+
+def get_moon_illuminations(dates) -> dict:
+    """
+    Like get_moon_illumination() but for many dates with a single download.
+    Returns {date: '45%'}; dates that are missing from the source are left out.
+    """
+    url = MOON_DATA_URL
+    wanted = {d.isoformat(): d for d in dates}
+
+    try:
+        resp = requests.get(url)
+        resp.raise_for_status()
+    except requests.RequestException:
+        return {}
+
+    found = {}
+    for line in resp.text.strip().splitlines()[1:]:  # skip header
+        parts = line.split(",")
+        if len(parts) < 2 or parts[0] not in wanted:
+            continue
+        try:
+            found[wanted[parts[0]]] = f"{round(float(parts[1]) * 100)}%"
+        except ValueError:
+            continue
+
+    return found
\ No newline at end of file
@@ -0,0 +1,207 @@
+# profiler.py - Opt-in per-request profiling for NightSky Helper
+# Runs selected requests under cProfile plus a stack sampler and keeps the results (pstats file,
+# collapsed stacks for flame graphs, request metadata) in a bounded on-disk ring of profiles
+
+import cProfile
+import hmac
+import io
+import json
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+PROFILE_HEADER = "X-Nightsky-Profile"
+
+def token_matches(supplied: str | None, token: str | None) -> bool:
+    # Constant-time check of a header value against the token. Compared as bytes: compare_digest
+    # raises TypeError for non-ASCII str, and WSGI header strings carry their raw bytes as latin-1
+    if not supplied or not token:
+        return False
+    return hmac.compare_digest(supplied.encode("latin-1", "replace"), token.encode("utf-8"))
+
+class ProfileStore:
+    # Directory of profiles named <id>.json / .prof / .collapsed; the oldest are deleted past max_profiles
+    KINDS = ("json", "prof", "collapsed")
+
+    def __init__(self, directory: str, max_profiles: int = 50):
+        self.directory = directory
+        self.max_profiles = max_profiles
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def path(self, profile_id: str, kind: str) -> str | None:
+        # None for unknown kinds and ids that are not plain profile names (no path traversal)
+        if kind not in self.KINDS or not profile_id.replace("-", "").isalnum():
+            return None
+        path = os.path.join(self.directory, f"{profile_id}.{kind}")
+        return path if os.path.exists(path) else None
+
+    def save(self, meta: dict, profile: cProfile.Profile, stacks: dict) -> str:
+        # Ids sort by creation time, which is what the ring eviction relies on
+        profile_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + "-" + uuid.uuid4().hex[:6]
+        base = os.path.join(self.directory, profile_id)
+        profile.dump_stats(base + ".prof")
+        with open(base + ".collapsed", "w", encoding="utf-8") as file:
+            file.writelines(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+        # Metadata last: a profile is only listed once all of its files exist
+        with open(base + ".json", "w", encoding="utf-8") as file:
+            json.dump({"id": profile_id, **meta}, file)
+        self._evict()
+        return profile_id
+
+    def _evict(self):
+        with self._lock:
+            ids = sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+            for profile_id in ids[:max(0, len(ids) - self.max_profiles)]:
+                for kind in self.KINDS:
+                    try:
+                        os.remove(os.path.join(self.directory, f"{profile_id}.{kind}"))
+                    except FileNotFoundError:
+                        pass  # another worker evicted it first
+
+    def list(self) -> list[dict]:
+        # Newest first
+        profiles = []
+        for name in sorted(os.listdir(self.directory), reverse=True):
+            if name.endswith(".json"):
+                try:
+                    with open(os.path.join(self.directory, name), encoding="utf-8") as file:
+                        profiles.append(json.load(file))
+                except (OSError, ValueError):
+                    continue  # evicted or half-written by another worker
+        return profiles
+
+    def call_tree(self, profile_id: str, limit: int = 60) -> str | None:
+        # Text report of the heaviest functions by cumulative time, with their callees
+        path = self.path(profile_id, "prof")
+        if path is None:
+            return None
+        out = io.StringIO()
+        stats = pstats.Stats(path, stream=out).strip_dirs().sort_stats("cumulative")
+        stats.print_stats(limit)
+        stats.print_callees(limit)
+        return out.getvalue()
+
+class _StackSampler(threading.Thread):
+    # Samples one thread's Python stack every `interval` seconds into collapsed-stack counts
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: dict = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if names:
+                stack = ";".join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def stop(self) -> dict:
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+class _ProfiledRequest:
+    # Profiling state for one request; finish() runs once, when the response body is closed
+    def __init__(self, store: ProfileStore, environ: dict, trigger: str, interval: float):
+        self.store = store
+        self.meta = {
+            "method": environ.get("REQUEST_METHOD"),
+            "path": environ.get("PATH_INFO"),
+            "query": environ.get("QUERY_STRING", ""),
+            "trigger": trigger,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        self.status = None
+        self.started = time.perf_counter()
+        # Enable first: on Python 3.12+ this raises ValueError while another profile is active,
+        # and nothing else has been started yet that would need stopping
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        self.sampler = _StackSampler(threading.get_ident(), interval)
+        self.sampler.start()
+
+    def finish(self):
+        self.profile.disable()
+        stacks = self.sampler.stop()
+        self.meta["status"] = self.status
+        self.meta["duration_ms"] = round((time.perf_counter() - self.started) * 1000, 1)
+        self.meta["samples"] = sum(stacks.values())
+        self.store.save(self.meta, self.profile, stacks)
+
+class _ClosingBody:
+    # Response iterable that ends the profile when the server closes it (after streamed bodies finish)
+    def __init__(self, body, on_close):
+        self.body = body
+        self.on_close = on_close
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        try:
+            if hasattr(self.body, "close"):
+                self.body.close()
+        finally:
+            self.on_close()
+
+class ProfilingMiddleware:
+    """
+    WSGI middleware that profiles a request when it carries PROFILE_HEADER equal to `token`,
+    or at random with probability `sample_rate`. Only install it when one of them is set:
+    without the middleware in the stack, unprofiled requests pay nothing at all.
+    Paths starting with one of `skip_prefixes` (the admin endpoints) are never profiled.
+    """
+
+    def __init__(self, wsgi_app, store: ProfileStore, token: str | None = None, sample_rate: float = 0.0,
+                 interval: float = 0.005, skip_prefixes: tuple = ()):
+        self.wsgi_app = wsgi_app
+        self.store = store
+        self.token = token
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.skip_prefixes = skip_prefixes
+
+    def _trigger(self, environ) -> str | None:
+        if environ.get("PATH_INFO", "").startswith(self.skip_prefixes):
+            return None
+        header = environ.get("HTTP_" + PROFILE_HEADER.upper().replace("-", "_"))
+        if token_matches(header, self.token):
+            return "header"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sample"
+        return None
+
+    def __call__(self, environ, start_response):
+        trigger = self._trigger(environ)
+        if trigger is None:
+            return self.wsgi_app(environ, start_response)
+
+        try:
+            profiled = _ProfiledRequest(self.store, environ, trigger, self.interval)
+        except ValueError:
+            # Another request is being profiled (one profiler at a time on Python 3.12+): serve unprofiled
+            return self.wsgi_app(environ, start_response)
+
+        def recording_start_response(status, headers, exc_info=None):
+            profiled.status = int(status.split(" ", 1)[0])
+            return start_response(status, headers, exc_info)
+
+        try:
+            body = self.wsgi_app(environ, recording_start_response)
+        except BaseException:
+            profiled.finish()
+            raise
+        return _ClosingBody(body, profiled.finish)
@@ -0,0 +1,145 @@
+# satellites.py - Satellite and ISS pass prediction for NightSky Helper
+# Reads a local TLE file (no network) and propagates every satellite over the whole night in one
+# vectorized SGP4 call, then finds rise, culmination and set for each pass above the site
+
+import os
+from datetime import date, timedelta
+from functools import lru_cache
+import numpy as np
+import pytz
+from sgp4.api import SatrecArray
+from skyfield.api import load
+from skyfield.sgp4lib import TEME
+from location import format_time
+
+DEFAULT_TLE_FILE = os.environ.get(
+    "NIGHTSKY_TLE_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "satellites.tle")
+)
+
+EARTH_RADIUS_KM = 6378.137
+EARTH_FLATTENING = 1 / 298.257223563
+
+# A satellite can only be seen once the sky is reasonably dark (end of civil twilight)
+DARK_SUN_ALTITUDE = -6.0
+
+@lru_cache(maxsize=4)
+def _load_tle_file(filename: str, mtime: float):
+    # Cached per (path, modification time) so an updated TLE file is picked up without a restart
+    satellites = load.tle_file(filename)
+    return [sat.name for sat in satellites], SatrecArray([sat.model for sat in satellites])
+
+def load_satellites(filename: str = DEFAULT_TLE_FILE):
+    # Returns (names, SatrecArray); raises FileNotFoundError if the TLE file is missing
+    return _load_tle_file(filename, os.path.getmtime(filename))
+
+def _observer_ecef(latitude: float, longitude: float) -> np.ndarray:
+    # WGS84 geodetic position of the observer (sea level) in Earth-fixed km
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    e2 = EARTH_FLATTENING * (2 - EARTH_FLATTENING)
+    n = EARTH_RADIUS_KM / np.sqrt(1 - e2 * np.sin(lat) ** 2)
+    return np.array([
+        n * np.cos(lat) * np.cos(lon),
+        n * np.cos(lat) * np.sin(lon),
+        n * (1 - e2) * np.sin(lat)
+    ])
+
+def _to_earth_fixed(vectors: np.ndarray, gmst_hours: np.ndarray) -> np.ndarray:
+    # Rotate (..., times, 3) inertial vectors into the Earth-fixed frame by Greenwich sidereal time
+    theta = np.radians(gmst_hours * 15.0)
+    cos_t, sin_t = np.cos(theta), np.sin(theta)
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    return np.stack([cos_t * x + sin_t * y, -sin_t * x + cos_t * y, z], axis=-1)
+
+def _topocentric_altaz(ecef: np.ndarray, latitude: float, longitude: float):
+    # Altitude/azimuth (degrees) of Earth-fixed positions (..., 3) seen from the observer
+    lat, lon = np.radians(latitude), np.radians(longitude)
+    rho = ecef - _observer_ecef(latitude, longitude)
+    x, y, z = rho[..., 0], rho[..., 1], rho[..., 2]
+    east = -np.sin(lon) * x + np.cos(lon) * y
+    north = -np.sin(lat) * np.cos(lon) * x - np.sin(lat) * np.sin(lon) * y + np.cos(lat) * z
+    up = np.cos(lat) * np.cos(lon) * x + np.cos(lat) * np.sin(lon) * y + np.sin(lat) * z
+    alt = np.degrees(np.arctan2(up, np.hypot(east, north)))
+    az = np.degrees(np.arctan2(east, north)) % 360.0
+    return alt, az
+
+def _crossing(alt: np.ndarray, i0: int, i1: int, threshold: float) -> float:
+    # Fractional sample index where altitude crosses the threshold between samples i0 and i1
+    a0, a1 = alt[i0], alt[i1]
+    if a1 == a0:
+        return float(i1)
+    return i0 + (threshold - a0) / (a1 - a0) * (i1 - i0)
+
+def predict_passes(calculator, obs_date: date, filename: str = DEFAULT_TLE_FILE,
+                   min_altitude: float = 10.0, step_seconds: int = 20) -> list[dict]:
+    """
+    Finds every pass above min_altitude between sunset and the next sunrise for all satellites
+    in the TLE file. A pass is 'visible' when the satellite is sunlit while the observer's sky
+    is dark (Sun below DARK_SUN_ALTITUDE) for at least one sample.
+    """
+    names, satellites = load_satellites(filename)
+    observer = calculator.observer
+    sunset, sunrise = calculator.night_window(obs_date)
+
+    # Sample times: one array shared by every satellite
+    start_utc = sunset.astimezone(pytz.utc)
+    span_seconds = (sunrise - sunset).total_seconds()
+    offsets = np.arange(0.0, span_seconds + step_seconds, step_seconds)
+    ts = calculator.ts
+    t = ts.utc(start_utc.year, start_utc.month, start_utc.day,
+               start_utc.hour, start_utc.minute, start_utc.second + offsets)
+
+    # SGP4 takes UTC Julian dates split into whole and fractional parts
+    jd_start = 2440587.5 + start_utc.timestamp() / 86400.0
+    jd = np.full(offsets.shape, np.floor(jd_start))
+    fr = (jd_start - np.floor(jd_start)) + offsets / 86400.0
+
+    # One call propagates all satellites x all times: positions are (satellites, times, 3) in km (TEME)
+    errors, positions, _ = satellites.sgp4(jd, fr)
+
+    gmst = t.gmst
+    alt, az = _topocentric_altaz(_to_earth_fixed(positions, gmst), observer.latitude, observer.longitude)
+    alt = np.where(errors == 0, alt, -90.0)
+
+    # Sun direction per sample (geocentric), used for both the observer's darkness and the Earth-shadow test.
+    # Skyfield positions are in the GCRS (J2000) frame; rotate into TEME to match the SGP4 positions.
+    sun = (calculator.eph['sun'] - calculator.eph['earth']).at(t).frame_xyz(TEME).km.T
+    sun_alt, _ = _topocentric_altaz(_to_earth_fixed(sun, gmst), observer.latitude, observer.longitude)
+    observer_dark = sun_alt < DARK_SUN_ALTITUDE
+
+    # Cylindrical Earth shadow: sunlit if on the day side or farther than one Earth radius from the shadow axis
+    sun_unit = sun / np.linalg.norm(sun, axis=-1, keepdims=True)
+    along = np.einsum('stk,tk->st', positions, sun_unit)
+    off_axis = np.linalg.norm(positions - along[..., None] * sun_unit, axis=-1)
+    sunlit = (along > 0) | (off_axis > EARTH_RADIUS_KM)
+
+    # Pass boundaries: rising and falling edges of the above-threshold mask, found for all satellites at once
+    above = alt >= min_altitude
+    edges = np.diff(np.pad(above, ((0, 0), (1, 1))).astype(np.int8), axis=1)
+    rise_sat, rise_idx = np.nonzero(edges == 1)
+    _, set_idx = np.nonzero(edges == -1)
+    visible = sunlit & observer_dark & above
+
+    last = len(offsets) - 1
+    passes = []
+    for sat, i_rise, i_end in zip(rise_sat, rise_idx, set_idx):
+        i_set = i_end - 1
+        row = alt[sat]
+        i_peak = i_rise + int(np.argmax(row[i_rise:i_end]))
+        rise = _crossing(row, i_rise - 1, i_rise, min_altitude) if i_rise > 0 else 0.0
+        set_ = _crossing(row, i_set, i_set + 1, min_altitude) if i_set < last else float(last)
+
+        passes.append((rise, {
+            'name': names[sat],
+            'rise': format_time(sunset + timedelta(seconds=rise * step_seconds)),
+            'rise_azimuth': round(float(az[sat, i_rise]), 1),
+            'culmination': format_time(sunset + timedelta(seconds=float(offsets[i_peak]))),
+            'max_altitude': round(float(row[i_peak]), 1),
+            'set': format_time(sunset + timedelta(seconds=set_ * step_seconds)),
+            'set_azimuth': round(float(az[sat, i_set]), 1),
+            'visible': bool(visible[sat, i_rise:i_end].any())
+        }))
+
+    # Chronological order across all satellites
+    passes.sort(key=lambda item: item[0])
+    return [p for _, p in passes]
@@ -0,0 +1,105 @@
+# sky_brightness.py - Light-pollution lookup for NightSky Helper
+# Reads a sky-brightness (SQM, mag/arcsec^2) or Bortle raster through a read-only memory map, so
+# only the pages actually touched are loaded and every worker on the machine shares them
+# through the OS page cache instead of each holding its own copy of the raster
+
+import json
+import os
+from functools import lru_cache
+import numpy as np
+
+# Upper SQM bound (mag/arcsec^2) of each Bortle class 1-8; darker skies have higher SQM values
+BORTLE_SQM_LIMITS = np.array([21.99, 21.89, 21.69, 20.49, 19.50, 18.94, 18.38, 17.80])
+# Typical SQM for each Bortle class 1-9, used when a raster stores Bortle classes
+BORTLE_TYPICAL_SQM = np.array([22.0, 21.9, 21.8, 21.1, 20.0, 19.2, 18.7, 18.1, 17.5])
+
+# Raster used for sites and grids when NIGHTSKY_SKY_BRIGHTNESS points at one
+SKY_BRIGHTNESS_FILE = os.environ.get("NIGHTSKY_SKY_BRIGHTNESS")
+
+def bortle_from_sqm(sqm):
+    # Bortle class (1-9) for SQM values; arrays in, arrays out
+    return 9 - np.searchsorted(BORTLE_SQM_LIMITS[::-1], np.asarray(sqm), side='left')
+
+def sqm_from_bortle(bortle):
+    return BORTLE_TYPICAL_SQM[np.clip(np.asarray(bortle, dtype=int), 1, 9) - 1]
+
+class SkyBrightnessRaster:
+    """
+    A north-up lat/lon grid: row 0 starts at `north`, column 0 at `west`, square cells of
+    cell_degrees. Metadata comes from a JSON sidecar next to the data file (<name>.json):
+      north, west, cell_degrees   grid placement
+      units                       "sqm" (default) or "bortle"
+      nodata                      optional value marking cells without data
+    .npy files carry their own shape and dtype; any other file is read as a raw grid and the
+    sidecar also needs rows, cols, dtype (e.g. "<f4") and optionally offset (header bytes).
+    """
+
+    def __init__(self, filename: str):
+        with open(os.path.splitext(filename)[0] + ".json", 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        if filename.endswith(".npy"):
+            self.data = np.load(filename, mmap_mode='r')
+        else:
+            self.data = np.memmap(filename, dtype=np.dtype(meta['dtype']), mode='r',
+                                  offset=meta.get('offset', 0), shape=(meta['rows'], meta['cols']))
+        self.north = float(meta['north'])
+        self.west = float(meta['west'])
+        self.cell_degrees = float(meta['cell_degrees'])
+        self.units = meta.get('units', 'sqm')
+        self.nodata = meta.get('nodata')
+
+    def _to_sqm(self, values):
+        values = np.asarray(values, dtype=float)
+        if self.nodata is not None:
+            values = np.where(values == self.nodata, np.nan, values)
+        if self.units == 'bortle':
+            values = np.where(np.isnan(values), np.nan, sqm_from_bortle(np.nan_to_num(values, nan=1)))
+        return values
+
+    def lookup_many(self, latitudes, longitudes):
+        # SQM for each (lat, lon) pair (broadcast); NaN outside the raster or where it has no data
+        rows = np.floor((self.north - np.asarray(latitudes, dtype=float)) / self.cell_degrees).astype(int)
+        cols = np.floor((np.asarray(longitudes, dtype=float) - self.west) / self.cell_degrees).astype(int)
+        rows, cols = np.broadcast_arrays(rows, cols)
+        inside = (rows >= 0) & (rows < self.data.shape[0]) & (cols >= 0) & (cols < self.data.shape[1])
+        values = np.full(rows.shape, np.nan)
+        values[inside] = self.data[rows[inside], cols[inside]]
+        return self._to_sqm(values)
+
+    def lookup(self, latitude: float, longitude: float) -> float | None:
+        # SQM at one point: a single cell read, or None outside the raster
+        row = int(np.floor((self.north - latitude) / self.cell_degrees))
+        col = int(np.floor((longitude - self.west) / self.cell_degrees))
+        if not (0 <= row < self.data.shape[0] and 0 <= col < self.data.shape[1]):
+            return None
+        value = float(self._to_sqm(self.data[row, col]))
+        return None if np.isnan(value) else value
+
+@lru_cache(maxsize=4)
+def load_raster(filename: str) -> SkyBrightnessRaster:
+    # One mapping per file per process
+    return SkyBrightnessRaster(filename)
+
+def default_raster() -> SkyBrightnessRaster | None:
+    return load_raster(SKY_BRIGHTNESS_FILE) if SKY_BRIGHTNESS_FILE else None
+
+def site_sky_brightness(latitude: float, longitude: float) -> float | None:
+    # SQM for a site from the configured raster, or None when there is no raster or no data there
+    raster = default_raster()
+    return raster.lookup(latitude, longitude) if raster else None
+
+def visibility_score(sqm: float | None, moon_illum: str, cloud_cover: int | None = None) -> float | None:
+    """
+    0-10 rating of a night at a site: sky darkness (SQM 17 = inner city -> 0, 22 = pristine -> 1)
+    scaled down by up to half for a full moon, and by the forecast cloud cover when there is one.
+    None when the site's sky brightness is unknown.
+    """
+    if sqm is None:
+        return None
+    darkness = min(max((sqm - 17.0) / 5.0, 0.0), 1.0)
+    try:
+        moon = float(moon_illum.rstrip('%')) / 100.0
+    except (AttributeError, ValueError):
+        moon = 0.5  # moon data unavailable: assume an average night
+    clear = 1.0 if cloud_cover is None else 1.0 - cloud_cover / 100.0
+    return round(10.0 * darkness * (1.0 - 0.5 * moon) * clear, 1)
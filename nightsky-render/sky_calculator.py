@@ -3,77 +3,165 @@
 
 # Import modules to support program execution and celestial data dictionaries from celestial_objects.py
 from skyfield.api import load
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from astral import LocationInfo, Depression
-from astral.sun import sun, dusk
+from astral.sun import sunset, sunrise, dusk, dawn
+import math
 import pytz
 from models import Observation
 from celestial_objects import CELESTIAL_OBJECTS, PLANET_MAP, STAR_COORDS
-from location import DENVER, to_utc, format_time
-from moon import get_moon_illumination
+from location import DENVER, Location, to_utc, format_time
+from moon import get_moon_illuminations
+from weather import get_cloud_covers
+from sky_math import altaz
+from sky_brightness import bortle_from_sqm, visibility_score
+import fast_engine
+
+# "full" uses the de421 ephemeris; "fast" uses the analytic formulae in fast_engine.py (no SPK file)
+PRECISIONS = ("full", "fast")
 
 class SkyCalculator:
     # Handles astronomy calculations and clarifies Skyfield terminology for the user
-    def __init__(self):
-        self.eph = load('de421.bsp')
+    def __init__(self, observer: Location = DENVER, precision: str = "full"):
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision '{precision}'. Choose from: {', '.join(PRECISIONS)}.")
+        self.precision = precision
+        self.eph = load('de421.bsp') if precision == "full" else None
         self.ts = load.timescale()
-        self.observer = DENVER
+        self.observer = observer
         self.city = LocationInfo(
-            "Denver",
-            "USA",
-            "America/Denver",
-            DENVER.latitude,
-            DENVER.longitude
+            observer.name,
+            "",
+            observer.tz.zone,
+            observer.latitude,
+            observer.longitude
         )
 
+    def night_window(self, obs_date: date):
+        # Sunset on obs_date through sunrise the next morning, in local time.
+        # Asked for directly rather than through sun(), which also needs civil dawn and dusk and so
+        # fails on light summer nights when the Sun does set; ValueError only if it does not
+        tz = self.observer.tz
+        return (sunset(self.city.observer, date=obs_date, tzinfo=tz),
+                sunrise(self.city.observer, date=obs_date + timedelta(days=1), tzinfo=tz))
+
+    def dark_window(self, obs_date: date):
+        # Astronomical darkness for the night starting on obs_date: (dusk, next morning's dawn)
+        # astral raises ValueError when the Sun never gets 18 degrees below the horizon (high latitude summers)
+        tz = self.observer.tz
+        dark_start = dusk(self.city.observer, date=obs_date, depression=Depression.ASTRONOMICAL, tzinfo=tz)
+        dark_end = dawn(self.city.observer, date=obs_date + timedelta(days=1), depression=Depression.ASTRONOMICAL, tzinfo=tz)
+        return dark_start, dark_end
+
+    def _is_up(self, apparent):
+        # Above the site's horizon (its skyline mask, if it has one); works for scalar and vector times
+        alt, az, _ = apparent.altaz()
+        return self.observer.above_horizon(alt.degrees, az.degrees)
+
+    def _site_quality(self, moon_illum: str, cloud_cover) -> dict:
+        # Light-pollution and weather fields of an Observation for this site and night
+        sqm = self.observer.sky_brightness
+        return {
+            'sky_brightness': None if sqm is None else round(sqm, 2),
+            'bortle': None if sqm is None else int(bortle_from_sqm(sqm)),
+            'visibility_score': visibility_score(sqm, moon_illum, cloud_cover),
+            'cloud_cover': cloud_cover
+        }
+
     def calculate(self, obs_date: date) -> Observation:
-        # Use Skyfield library to calculate visible planets and stars
+        # One night is a batch of one, so missing events are handled the same way as for ranges
+        return self.calculate_many([obs_date])[0]
+
+    def calculate_many(self, dates: list, moon_illums: dict | None = None,
+                       cloud_covers: dict | None = None) -> list[Observation]:
+        # Same results as calculate() for each date, but every planet and star is observed once
+        # for all of the nights' 10 PM instants (one vectorized Skyfield call) instead of once per night
+
+        if self.precision == "fast":
+            return self._calculate_fast(dates, moon_illums if moon_illums is not None else get_moon_illuminations(dates),
+                                        cloud_covers if cloud_covers is not None else get_cloud_covers(self.observer, dates))
 
         observer_loc = self.eph['earth'] + self.observer.topos
 
         tz = self.observer.tz
 
-        sun_times = sun(
-            self.city.observer,
-            date=obs_date,
-            tzinfo=tz
-        )
-        sunset = sun_times["sunset"]
-        sunrise = sun_times["sunrise"]
-        dark_start = dusk(
-            self.city.observer,
-            date=obs_date,
-            depression=Depression.ASTRONOMICAL,
-            tzinfo=tz
-        )
-
-        # Define the time for checking visibility: 10:00 PM local time on the observation date
-        t_night = self.ts.utc(to_utc(datetime(obs_date.year, obs_date.month, obs_date.day, 22)))
+        t_nights = self.ts.from_datetimes([to_utc(datetime(d.year, d.month, d.day, 22), tz) for d in dates])
 
-        # Determine which planets are visible above the horizon at 10 PM
-        visible_planets = [
-            name for name in CELESTIAL_OBJECTS['planets']
+        # Boolean array per object: above the horizon at 10 PM on each night
+        planets_up = {
+            name: self._is_up(observer_loc.at(t_nights).observe(self.eph[eph_name]).apparent())
+            for name in CELESTIAL_OBJECTS['planets']
             if (eph_name := PLANET_MAP.get(name)) and eph_name in self.eph
-            and observer_loc.at(t_night).observe(self.eph[eph_name]).apparent().altaz()[0].degrees > 0
-        ]
+        }
+        stars_up = {
+            name: self._is_up(observer_loc.at(t_nights).observe(star).apparent())
+            for name in CELESTIAL_OBJECTS['stars']
+            if (star := STAR_COORDS.get(name))
+        }
 
-        # Determine which stars are visible above the horizon at 10 PM
-        visible_stars = [
-            name for name in CELESTIAL_OBJECTS['stars']
-            if (star := STAR_COORDS.get(name)) and
-            observer_loc.at(t_night).observe(star).apparent().altaz()[0].degrees > 0
-        ]
+        # One download of the moon data covers every night in the batch
+        if moon_illums is None:
+            moon_illums = get_moon_illuminations(dates)
+        if cloud_covers is None:
+            cloud_covers = get_cloud_covers(self.observer, dates)
 
-        # New feature: added moon illumination data via web scraping
-        moon_illum = get_moon_illumination(obs_date)
-
-        # Return all relevant stargazing data
-        return Observation(
-            date=obs_date.isoformat(),
-            sunset=format_time(sunset),
-            dark_sky=format_time(dark_start),
-            sunrise=format_time(sunrise),
-            planets=visible_planets,
-            stars=visible_stars,
-            moon_illum=moon_illum
-        )
+        def event(fn, obs_date, **kwargs):
+            # astral raises ValueError when the event does not happen that day (polar day or night,
+            # no astronomical darkness); only that field of that night becomes "Unavailable"
+            try:
+                return fn(self.city.observer, date=obs_date, tzinfo=tz, **kwargs)
+            except ValueError:
+                return None
+
+        observations = []
+        for i, obs_date in enumerate(dates):
+            observations.append(Observation(
+                date=obs_date.isoformat(),
+                sunset=format_time(event(sunset, obs_date)),
+                dark_sky=format_time(event(dusk, obs_date, depression=Depression.ASTRONOMICAL)),
+                sunrise=format_time(event(sunrise, obs_date)),
+                planets=[name for name, up in planets_up.items() if up[i]],
+                stars=[name for name, up in stars_up.items() if up[i]],
+                moon_illum=moon_illums.get(obs_date, "N/A"),
+                **self._site_quality(moon_illums.get(obs_date, "N/A"), cloud_covers.get(obs_date))
+            ))
+        return observations
+
+    def _calculate_fast(self, dates: list, moon_illums: dict, cloud_covers: dict) -> list[Observation]:
+        # Fast-precision version of calculate_many(): every night, planet and star in a few NumPy calls
+        tz = self.observer.tz
+        lat, lon = self.observer.latitude, self.observer.longitude
+
+        midnights = fast_engine.julian_date([to_utc(datetime(d.year, d.month, d.day), tz).timestamp() for d in dates])
+        events = fast_engine.sun_events(midnights, lat, lon)
+
+        jd_night = fast_engine.julian_date([to_utc(datetime(d.year, d.month, d.day, 22), tz).timestamp() for d in dates])
+        lst = ((fast_engine.gmst_hours(jd_night) + lon / 15.0) % 24.0)[None, :]
+
+        planet_names = [name for name in CELESTIAL_OBJECTS['planets'] if name in fast_engine.PLANET_ELEMENTS]
+        ra, dec = fast_engine.planet_radec(planet_names, jd_night)
+        planets_up = self.observer.above_horizon(*altaz(lst, ra, dec, lat))
+
+        star_names = [name for name in CELESTIAL_OBJECTS['stars'] if name in STAR_COORDS]
+        star_ra = [[STAR_COORDS[name].ra.hours] for name in star_names]
+        star_dec = [[STAR_COORDS[name].dec.degrees] for name in star_names]
+        ra, dec = fast_engine.precess(star_ra, star_dec, jd_night[None, :])
+        stars_up = self.observer.above_horizon(*altaz(lst, ra, dec, lat))
+
+        def local(jd):
+            # Julian date -> local datetime, None when the event does not happen
+            return None if math.isnan(jd) else datetime.fromtimestamp((jd - 2440587.5) * 86400.0, tz)
+
+        return [
+            Observation(
+                date=obs_date.isoformat(),
+                sunset=format_time(local(events['sunset'][i])),
+                dark_sky=format_time(local(events['dark_start'][i])),
+                sunrise=format_time(local(events['sunrise'][i])),
+                planets=[name for p, name in enumerate(planet_names) if planets_up[p, i]],
+                stars=[name for s, name in enumerate(star_names) if stars_up[s, i]],
+                moon_illum=moon_illums.get(obs_date, "N/A"),
+                **self._site_quality(moon_illums.get(obs_date, "N/A"), cloud_covers.get(obs_date))
+            )
+            for i, obs_date in enumerate(dates)
+        ]
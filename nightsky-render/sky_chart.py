@@ -0,0 +1,162 @@
+# sky_chart.py - All-sky chart rendering for NightSky Helper
+# Stereographic projection of the sky above the site (zenith at the centre, horizon at the rim,
+# north up and east left as when looking up), rendered to SVG or PNG without extra dependencies
+
+import csv
+import os
+import struct
+import zlib
+from functools import lru_cache
+import numpy as np
+from celestial_objects import PLANET_MAP
+from sky_math import precess_to_date, local_sidereal_hours, altaz
+
+BRIGHT_STARS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "bright_stars.csv")
+
+# Colours follow the site's palette (styles.css)
+BACKGROUND = (0x00, 0x30, 0x49)
+SKY = (0x00, 0x1d, 0x2e)
+STAR = (0xf4, 0xf3, 0xee)
+PLANET = (0xf4, 0xc9, 0x5d)
+MOON = (0xd9, 0xd9, 0xd9)
+
+# Only stars at least this bright get a text label on SVG charts
+LABEL_MAGNITUDE = 1.0
+
+# PNG rows drawn and compressed at a time, so large charts never need full-frame temporaries
+PNG_BAND_ROWS = 128
+
+@lru_cache(maxsize=1)
+def load_bright_stars(filename: str = BRIGHT_STARS) -> dict:
+    # Bright-star list as NumPy columns (J2000 RA/Dec)
+    with open(filename, 'r', newline='', encoding='utf-8') as file:
+        rows = list(csv.DictReader(file))
+    return {
+        'names': np.array([row['name'] for row in rows], dtype=object),
+        'ra_hours': np.array([float(row['ra_hours']) for row in rows]),
+        'dec_degrees': np.array([float(row['dec_degrees']) for row in rows]),
+        'magnitudes': np.array([float(row['magnitude']) for row in rows]),
+    }
+
+def chart_objects(calculator, t) -> dict:
+    """
+    Positions of everything drawn on the chart at Skyfield time t.
+    Stars are handled as one array; planets and the Moon come from the ephemeris.
+    """
+    observer = calculator.observer
+    stars = load_bright_stars()
+    ra, dec = precess_to_date(stars['ra_hours'], stars['dec_degrees'], t)
+    star_alt, star_az = altaz(local_sidereal_hours(t, observer.longitude), ra, dec, observer.latitude)
+    up = star_alt > 0
+
+    observer_loc = calculator.eph['earth'] + observer.topos
+    bodies = []
+    for name, eph_name in list(PLANET_MAP.items()) + [('Moon', 'moon')]:
+        alt, az, _ = observer_loc.at(t).observe(calculator.eph[eph_name]).apparent().altaz()
+        if alt.degrees > 0:
+            bodies.append((name, alt.degrees, az.degrees))
+
+    return {
+        'star_names': stars['names'][up],
+        'star_alt': star_alt[up],
+        'star_az': star_az[up],
+        'star_mag': stars['magnitudes'][up],
+        'bodies': bodies,
+    }
+
+def project(alt, az, size: int):
+    # Stereographic horizon projection to pixel coordinates; the horizon maps to the chart rim
+    radius = size / 2 * 0.92
+    r = radius * np.tan(np.radians(90.0 - np.asarray(alt)) / 2.0)
+    az = np.radians(az)
+    return size / 2 - r * np.sin(az), size / 2 - r * np.cos(az)
+
+def _star_radius(magnitudes, size: int):
+    # Brighter stars get bigger dots, scaled with the image
+    return np.clip(3.2 - 0.55 * np.asarray(magnitudes), 0.6, 4.0) * size / 500
+
+def render_svg(objects: dict, size: int, title: str = "") -> bytes:
+    half = size / 2
+    radius = half * 0.92
+    font = max(9, size // 50)
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{size}" height="{size}" viewBox="0 0 {size} {size}">',
+        f'<rect width="{size}" height="{size}" fill="#{bytes(BACKGROUND).hex()}"/>',
+        f'<circle cx="{half}" cy="{half}" r="{radius:.1f}" fill="#{bytes(SKY).hex()}" stroke="#f4f3ee" stroke-width="1"/>',
+    ]
+    if title:
+        parts.append(f'<title>{title}</title>')
+
+    # Cardinal points just outside the horizon circle (north up, east left)
+    for label, dx, dy in (('N', 0, -1), ('S', 0, 1), ('E', -1, 0), ('W', 1, 0)):
+        x = half + dx * (radius + font * 0.8)
+        y = half + dy * (radius + font * 0.8) + font / 3
+        parts.append(f'<text x="{x:.1f}" y="{y:.1f}" fill="#f4f3ee" font-size="{font}" text-anchor="middle">{label}</text>')
+
+    xs, ys = project(objects['star_alt'], objects['star_az'], size)
+    radii = _star_radius(objects['star_mag'], size)
+    for name, x, y, r, mag in zip(objects['star_names'], xs, ys, radii, objects['star_mag']):
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r:.2f}" fill="#{bytes(STAR).hex()}"/>')
+        if mag <= LABEL_MAGNITUDE:
+            parts.append(f'<text x="{x + r + 2:.1f}" y="{y + font / 3:.1f}" fill="#f4f3ee" font-size="{font * 0.8:.0f}">{name}</text>')
+
+    for name, alt, az in objects['bodies']:
+        x, y = project(alt, az, size)
+        colour = MOON if name == 'Moon' else PLANET
+        r = size / 60 if name == 'Moon' else size / 150
+        parts.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{r:.2f}" fill="#{bytes(colour).hex()}"/>')
+        parts.append(f'<text x="{x + r + 2:.1f}" y="{y + font / 3:.1f}" fill="#{bytes(colour).hex()}" font-size="{font}">{name}</text>')
+
+    parts.append('</svg>')
+    return '\n'.join(parts).encode('utf-8')
+
+def _draw_disc(image: np.ndarray, x: float, y: float, r: float, colour):
+    # Anti-aliased filled circle on a uint8 image, touching only the pixels in its bounding box;
+    # large discs (the sky) are blended a band of rows at a time to keep temporaries small
+    size = image.shape[0]
+    x0, x1 = max(int(x - r - 1), 0), min(int(x + r + 2), size)
+    y0, y1 = max(int(y - r - 1), 0), min(int(y + r + 2), size)
+    if x0 >= x1 or y0 >= y1:
+        return
+    dx = (np.arange(x0, x1, dtype=np.float32) + 0.5 - x)[None, :]
+    colour = np.asarray(colour, dtype=np.float32)
+    for top in range(y0, y1, PNG_BAND_ROWS):
+        bottom = min(top + PNG_BAND_ROWS, y1)
+        dy = (np.arange(top, bottom, dtype=np.float32) + 0.5 - y)[:, None]
+        coverage = np.clip(r + 0.5 - np.hypot(dx, dy), 0.0, 1.0)[..., None]
+        patch = image[top:bottom, x0:x1]
+        patch[:] = np.round(patch * (1 - coverage) + colour * coverage)
+
+def render_png(objects: dict, size: int) -> bytes:
+    # Raster version of the chart (no text labels); encoded with zlib, no imaging library needed
+    half = size / 2
+    image = np.empty((size, size, 3), dtype=np.uint8)
+    image[:] = BACKGROUND
+    _draw_disc(image, half, half, half * 0.92, SKY)
+
+    xs, ys = project(objects['star_alt'], objects['star_az'], size)
+    for x, y, r in zip(xs, ys, _star_radius(objects['star_mag'], size)):
+        _draw_disc(image, x, y, r, STAR)
+    for name, alt, az in objects['bodies']:
+        x, y = project(alt, az, size)
+        _draw_disc(image, x, y, size / 60 if name == 'Moon' else size / 150, MOON if name == 'Moon' else PLANET)
+
+    return _encode_png(image)
+
+def _encode_png(pixels: np.ndarray) -> bytes:
+    height, width, _ = pixels.shape
+    rows = pixels.reshape(height, width * 3)
+    # Each scanline is prefixed with filter type 0 (none); compressed a band at a time
+    compressor = zlib.compressobj(6)
+    data = []
+    for top in range(0, height, PNG_BAND_ROWS):
+        band = rows[top:top + PNG_BAND_ROWS]
+        data.append(compressor.compress(np.concatenate([np.zeros((len(band), 1), dtype=np.uint8), band], axis=1).tobytes()))
+    data.append(compressor.flush())
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header)
+            + chunk(b'IDAT', b''.join(data)) + chunk(b'IEND', b''))
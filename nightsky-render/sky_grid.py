@@ -0,0 +1,93 @@
+# sky_grid.py - Darkness and visibility over a latitude/longitude grid for NightSky Helper
+# Evaluates the Sun (and optionally one planet or the Moon) for every grid point x time sample
+# as broadcast NumPy arrays, so a whole region costs about as much as a few single-site queries
+
+from datetime import date, datetime, timedelta
+import numpy as np
+from celestial_objects import PLANET_MAP
+from sky_math import altaz
+import fast_engine
+
+# Sun altitude that counts as fully dark (astronomical twilight)
+DARK_SUN_ALTITUDE = -18.0
+
+def _geocentric_radec(calculator, target, t):
+    # RA (hours) / Dec (degrees) of date as seen from Earth's centre for 'Sun', 'Moon' or a planet name;
+    # t may be an array. Topocentric parallax is ignored (negligible except ~1 degree for the Moon).
+    if calculator.precision == "fast":
+        jd = t.ut1
+        if target == 'Sun':
+            return fast_engine.sun_radec(jd)
+        if target == 'Moon':
+            return fast_engine.moon_radec(jd)[:2]
+        ra, dec = fast_engine.planet_radec([target], jd)
+        return ra[0], dec[0]
+
+    eph_name = {'Sun': 'sun', 'Moon': 'moon'}.get(target) or PLANET_MAP[target]
+    ra, dec, _ = calculator.eph['earth'].at(t).observe(calculator.eph[eph_name]).apparent().radec(epoch='date')
+    return ra.hours, dec.degrees
+
+def compute_grid(calculator, obs_date: date, latitudes: np.ndarray, longitudes: np.ndarray, tz,
+                 target: str | None = None, local_time: tuple = (22, 0), step_minutes: int = 10,
+                 brightness=None) -> dict:
+    """
+    Returns, for every (latitude, longitude) pair:
+      dark_hours      - hours of astronomical darkness from local noon on obs_date to noon the next day
+      altitude        - altitude of `target` (a PLANET_MAP name or 'Moon') at local_time in tz, if given
+      sky_brightness  - SQM from `brightness` (a SkyBrightnessRaster), if given; NaN outside it
+    Arrays have shape (len(latitudes), len(longitudes)).
+    """
+    ts = calculator.ts
+    noon = tz.localize(datetime(obs_date.year, obs_date.month, obs_date.day, 12))
+    t_noon = ts.from_datetime(noon)
+    # One sample at the middle of each step, so the noon-to-noon window is counted exactly once
+    samples = int(24 * 60 / step_minutes)
+    t = ts.tt_jd(t_noon.tt + (np.arange(samples) + 0.5) * step_minutes / 1440.0)
+
+    sun_ra, sun_dec = _geocentric_radec(calculator, 'Sun', t)
+
+    # sin(altitude) of the Sun on a (lat, lon, time) grid; comparing sines avoids an arcsin per cell
+    hour_angle = np.radians((t.gast[None, :] + longitudes[:, None] / 15.0 - sun_ra[None, :]) * 15.0)
+    dec = np.radians(sun_dec)
+    lat = np.radians(latitudes)[:, None, None]
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * (np.cos(dec) * np.cos(hour_angle))[None, :, :]
+    dark_samples = np.count_nonzero(sin_alt < np.sin(np.radians(DARK_SUN_ALTITUDE)), axis=-1)
+
+    result = {'dark_hours': dark_samples * step_minutes / 60.0}
+
+    if target is not None:
+        when = tz.localize(datetime(obs_date.year, obs_date.month, obs_date.day, *local_time))
+        if local_time[0] < 12:
+            when += timedelta(days=1)  # early-morning hours belong to the same night
+        t_obj = ts.from_datetime(when)
+        ra, dec = _geocentric_radec(calculator, target, t_obj)
+        lst = (t_obj.gast + longitudes / 15.0) % 24.0
+        result['altitude'], _ = altaz(lst[None, :], ra, dec, latitudes[:, None])
+
+    if brightness is not None:
+        result['sky_brightness'] = brightness.lookup_many(latitudes[:, None], longitudes[None, :])
+
+    return result
+
+def rounded_list(values) -> list:
+    # JSON-ready nested list rounded to 2 decimals, with None where there is no data (NaN)
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), None, np.round(values, 2)).tolist()
+
+def grid_geojson(latitudes, longitudes, fields: dict) -> dict:
+    # One Point feature per grid cell centre, with each field rounded into its properties
+    lon_grid, lat_grid = np.meshgrid(longitudes, latitudes)
+    rounded = {name: rounded_list(np.ravel(values)) for name, values in fields.items()}
+    features = [
+        {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [round(lon, 4), round(lat, 4)]},
+            "properties": {name: values[i] for name, values in rounded.items()},
+        }
+        for i, (lat, lon) in enumerate(zip(lat_grid.ravel().tolist(), lon_grid.ravel().tolist()))
+    ]
+    return {"type": "FeatureCollection", "features": features}
+
+def grid_binary(fields: dict) -> bytes:
+    # Fields as consecutive little-endian float32 arrays (row-major, latitude rows)
+    return b''.join(np.ascontiguousarray(values, dtype='<f4').tobytes() for values in fields.values())
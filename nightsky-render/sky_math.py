@@ -0,0 +1,55 @@
+# sky_math.py - Vectorized coordinate helpers for NightSky Helper
+# Plain NumPy versions of the RA/Dec -> Alt/Az math so whole catalogs and time grids can be
+# evaluated in one pass instead of one Skyfield call per object
+
+import numpy as np
+
+# Sidereal time advances this many times faster than solar time
+SIDEREAL_RATE = 1.00273790935
+
+def radec_to_unit(ra_hours, dec_degrees):
+    # Unit vectors (..., 3) for right ascension (hours) and declination (degrees)
+    ra = np.radians(np.asarray(ra_hours, dtype=float) * 15.0)
+    dec = np.radians(np.asarray(dec_degrees, dtype=float))
+    cos_dec = np.cos(dec)
+    return np.stack([cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)], axis=-1)
+
+def unit_to_radec(vectors):
+    # Inverse of radec_to_unit: returns (ra_hours in [0, 24), dec_degrees)
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+    ra_hours = np.degrees(np.arctan2(y, x)) / 15.0 % 24.0
+    dec_degrees = np.degrees(np.arcsin(np.clip(z, -1.0, 1.0)))
+    return ra_hours, dec_degrees
+
+def precess_to_date(ra_hours, dec_degrees, t):
+    # J2000 catalog coordinates -> true equator and equinox of date for a scalar Skyfield Time.
+    # One 3x3 rotation (precession + nutation) is applied to every object at once.
+    vectors = radec_to_unit(ra_hours, dec_degrees)
+    return unit_to_radec(vectors @ t.M.T)
+
+def local_sidereal_hours(t, longitude):
+    # Apparent local sidereal time in hours for a (possibly array) Skyfield Time
+    return (t.gast + longitude / 15.0) % 24.0
+
+def altaz(lst_hours, ra_hours, dec_degrees, latitude):
+    # Altitude and azimuth (degrees, azimuth measured from north through east).
+    # All arguments broadcast, so (objects, 1) against (times,) gives an (objects, times) grid.
+    hour_angle = np.radians((np.asarray(lst_hours) - ra_hours) * 15.0)
+    dec = np.radians(dec_degrees)
+    lat = np.radians(latitude)
+
+    sin_alt = np.sin(lat) * np.sin(dec) + np.cos(lat) * np.cos(dec) * np.cos(hour_angle)
+    alt = np.arcsin(np.clip(sin_alt, -1.0, 1.0))
+
+    az = np.arctan2(
+        -np.cos(dec) * np.sin(hour_angle),
+        np.sin(dec) * np.cos(lat) - np.cos(dec) * np.sin(lat) * np.cos(hour_angle)
+    )
+    return np.degrees(alt), np.degrees(az) % 360.0
+
+def airmass(alt_degrees):
+    # Kasten & Young (1989) relative airmass; NaN for objects at or below the horizon
+    alt = np.asarray(alt_degrees, dtype=float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = 1.0 / (np.sin(np.radians(alt)) + 0.50572 * (alt + 6.07995) ** -1.6364)
+    return np.where(alt > 0, x, np.nan)
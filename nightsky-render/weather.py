@@ -0,0 +1,186 @@
+# weather.py - Cloud-cover forecasts for NightSky Helper
+# Pluggable forecast providers behind one pooled HTTP session with strict timeouts, a TTL cache
+# keyed by coarse grid cell and forecast hour, and concurrent fetches for multi-night ranges.
+# Any provider failure degrades to "no forecast" so observations are still returned.
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+import requests
+from requests.adapters import HTTPAdapter
+
+# NIGHTSKY_WEATHER_PROVIDER selects a provider from PROVIDERS; forecasts are off ("none") unless a
+# deployment opts in, since any other provider sends site coordinates to a third-party service.
+# NIGHTSKY_WEATHER_URL points the provider elsewhere (e.g. weather_stub.py for tests and benchmarks)
+WEATHER_PROVIDER = os.environ.get("NIGHTSKY_WEATHER_PROVIDER", "none")
+WEATHER_URL = os.environ.get("NIGHTSKY_WEATHER_URL")
+
+# Local hour whose cloud cover is reported with an observation (matches the 10 PM visibility checks)
+OBSERVATION_HOUR = 22
+
+class ForecastProvider:
+    """
+    Provider interface: hourly cloud cover (percent) at one point for whole UTC days.
+    Returns {aware UTC datetime on the hour: percent}; raising means the forecast is unavailable.
+    This base class is the "none" provider and never has a forecast.
+    """
+    horizon_days = 0  # how far ahead forecasts exist; hours beyond it are never requested
+
+    def __init__(self, base_url: str | None = None):
+        self.base_url = base_url
+
+    def hourly_cloud_cover(self, session, latitude: float, longitude: float,
+                           first_day: date, last_day: date, timeout) -> dict:
+        return {}
+
+class OpenMeteoProvider(ForecastProvider):
+    # Open-Meteo forecast API (no key needed); weather_stub.py serves the same format locally
+    horizon_days = 16
+
+    def __init__(self, base_url: str | None = None):
+        super().__init__((base_url or "https://api.open-meteo.com").rstrip("/"))
+
+    def hourly_cloud_cover(self, session, latitude, longitude, first_day, last_day, timeout) -> dict:
+        response = session.get(f"{self.base_url}/v1/forecast", timeout=timeout, params={
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": "cloud_cover",
+            "timezone": "GMT",
+            "start_date": first_day.isoformat(),
+            "end_date": last_day.isoformat(),
+        })
+        response.raise_for_status()
+        hourly = response.json()["hourly"]
+        return {
+            datetime.strptime(stamp, "%Y-%m-%dT%H:%M").replace(tzinfo=timezone.utc): cover
+            for stamp, cover in zip(hourly["time"], hourly["cloud_cover"])
+            if cover is not None
+        }
+
+PROVIDERS = {
+    "none": ForecastProvider,
+    "open-meteo": OpenMeteoProvider,
+}
+
+class WeatherService:
+    """
+    Cached cloud-cover lookups. Sites are snapped to cell_degrees grid cells, so nearby sites share
+    one forecast and one cache entry per hour. Successful answers (including "no forecast for that
+    hour") are kept for ttl seconds, failures for failure_ttl so an outage is not retried on every request.
+    """
+
+    def __init__(self, provider: ForecastProvider, cell_degrees: float = 0.25, ttl: float = 1800.0,
+                 failure_ttl: float = 60.0, timeout=(2.0, 4.0), max_workers: int = 8,
+                 chunk_days: int = 4, max_entries: int = 100_000):
+        self.provider = provider
+        self.cell_degrees = cell_degrees
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.timeout = timeout
+        self.chunk_days = chunk_days
+        self.max_entries = max_entries
+
+        # One keep-alive connection pool shared by every fetch thread
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather")
+
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "fetches": 0, "failures": 0}
+
+    def _cell(self, latitude: float, longitude: float) -> tuple:
+        size = self.cell_degrees
+        return round(round(latitude / size) * size, 4), round(round(longitude / size) * size, 4)
+
+    def _fetch(self, cell: tuple, first_day: date, last_day: date):
+        # Forecast for one cell and day span, or None if the provider failed
+        try:
+            result = self.provider.hourly_cloud_cover(self.session, cell[0], cell[1], first_day, last_day, self.timeout)
+        except (requests.RequestException, ValueError, KeyError, TypeError):
+            result = None
+        with self._lock:
+            self._counts["fetches"] += 1
+            self._counts["failures"] += result is None
+        return result
+
+    def _day_chunks(self, days: set) -> list[tuple]:
+        # Runs of consecutive days, at most chunk_days long, one provider request each
+        chunks = []
+        for day in sorted(days):
+            if chunks and day - chunks[-1][1] == timedelta(days=1) and (day - chunks[-1][0]).days < self.chunk_days:
+                chunks[-1] = (chunks[-1][0], day)
+            else:
+                chunks.append((day, day))
+        return chunks
+
+    def cloud_cover(self, latitude: float, longitude: float, instants: list) -> list:
+        """
+        Cloud cover (percent, or None when there is no forecast) for each aware datetime, taken at
+        the nearest forecast hour. Uncached days are fetched concurrently, in chunks.
+        """
+        cell = self._cell(latitude, longitude)
+        hours = [(t.astimezone(timezone.utc) + timedelta(minutes=30)).replace(minute=0, second=0, microsecond=0)
+                 for t in instants]
+
+        # Hours outside the provider's forecast window are answered without asking it
+        now = datetime.now(timezone.utc)
+        earliest, latest = now - timedelta(days=1), now + timedelta(days=self.provider.horizon_days)
+        wanted = {h for h in hours if earliest <= h <= latest}
+
+        found = {}
+        with self._lock:
+            clock = time.monotonic()
+            for hour in wanted:
+                entry = self._cache.get((cell, hour))
+                if entry and entry[0] > clock:
+                    self._cache.move_to_end((cell, hour))
+                    found[hour] = entry[1]
+            self._counts["hits"] += len(found)
+            self._counts["misses"] += len(wanted) - len(found)
+
+        missing = wanted - set(found)
+        if missing:
+            chunks = self._day_chunks({h.date() for h in missing})
+            futures = [(chunk, self.executor.submit(self._fetch, cell, *chunk)) for chunk in chunks]
+            fetched = {chunk: future.result() for chunk, future in futures}
+
+            with self._lock:
+                clock = time.monotonic()
+                for hour in missing:
+                    forecast = next(f for (first, last), f in fetched.items() if first <= hour.date() <= last)
+                    value = None if forecast is None else forecast.get(hour)
+                    ttl = self.failure_ttl if forecast is None else self.ttl
+                    self._cache[(cell, hour)] = (clock + ttl, value)
+                    self._cache.move_to_end((cell, hour))
+                    found[hour] = value
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+
+        return [None if found.get(h) is None else round(found[h]) for h in hours]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"provider": type(self.provider).__name__, "entries": len(self._cache), **self._counts}
+
+@lru_cache(maxsize=1)
+def default_service() -> WeatherService:
+    # Shared per process, so every request reuses the same connection pool and cache
+    provider = PROVIDERS.get(WEATHER_PROVIDER, ForecastProvider)
+    return WeatherService(provider(WEATHER_URL))
+
+def get_cloud_covers(observer, dates) -> dict:
+    # {date: percent or None} at OBSERVATION_HOUR local time for each night, from the shared service
+    dates = list(dates)
+    instants = [observer.tz.localize(datetime(d.year, d.month, d.day, OBSERVATION_HOUR)) for d in dates]
+    covers = default_service().cloud_cover(observer.latitude, observer.longitude, instants)
+    return dict(zip(dates, covers))
+
+def get_cloud_cover(observer, obs_date: date):
+    return get_cloud_covers(observer, [obs_date])[obs_date]
@@ -0,0 +1,84 @@
+# weather_stub.py - Local stand-in for the cloud-cover forecast API
+# Serves Open-Meteo style hourly cloud cover for any point and dates, deterministic per grid cell and
+# hour, so tests and benchmarks run with no network. Optional latency and failure injection.
+# Usage: python weather_stub.py [--port 8766] [--delay-ms 0] [--fail-rate 0]
+#        then NIGHTSKY_WEATHER_PROVIDER=open-meteo NIGHTSKY_WEATHER_URL=http://127.0.0.1:8766 python app.py
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+def stub_cloud_cover(latitude: float, longitude: float, when: datetime) -> int:
+    # Smooth pseudo-weather: fronts drift east over a few days, with a daily cycle on top
+    hours = (when - datetime(2000, 1, 1)).total_seconds() / 3600.0
+    front = math.sin(hours / 37.0 - longitude / 9.0) + 0.5 * math.sin(hours / 11.0 + latitude / 5.0)
+    daily = 0.3 * math.sin(2 * math.pi * (hours % 24) / 24.0)
+    return int(round(min(max(50 + 40 * (front / 1.5) + 10 * daily, 0), 100)))
+
+def make_handler(delay_ms: float = 0.0, fail_rate: float = 0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            if delay_ms:
+                time.sleep(delay_ms / 1000.0)
+            if url.path != "/v1/forecast" or random.random() < fail_rate:
+                self.send_error(503 if url.path == "/v1/forecast" else 404)
+                return
+            try:
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                latitude, longitude = float(query["latitude"]), float(query["longitude"])
+                first = datetime.strptime(query["start_date"], "%Y-%m-%d")
+                last = datetime.strptime(query["end_date"], "%Y-%m-%d")
+            except (KeyError, ValueError):
+                self.send_error(400)
+                return
+
+            times = [first + timedelta(hours=h) for h in range(int((last - first).days + 1) * 24)]
+            body = json.dumps({
+                "latitude": latitude,
+                "longitude": longitude,
+                "hourly_units": {"time": "iso8601", "cloud_cover": "%"},
+                "hourly": {
+                    "time": [t.strftime("%Y-%m-%dT%H:%M") for t in times],
+                    "cloud_cover": [stub_cloud_cover(latitude, longitude, t) for t in times],
+                },
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # quiet during benchmarks
+
+    return Handler
+
+def start_weather_stub(port: int = 0, delay_ms: float = 0.0, fail_rate: float = 0.0) -> ThreadingHTTPServer:
+    # Serves from a background thread; port 0 picks a free one (see server.server_address)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(delay_ms, fail_rate))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub cloud-cover forecast server")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="added latency per request")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of requests answered with 503")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.delay_ms, args.fail_rate))
+    print(f"Stub forecast server on http://127.0.0.1:{args.port}/v1/forecast (Ctrl+C to stop).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()